@@ -1,17 +1,37 @@
-from flask import Flask, render_template, jsonify, request, Response, stream_with_context
+from flask import Flask, render_template, jsonify, request, Response, stream_with_context, send_file
 from flask_cors import CORS
 import yt_dlp
 import re
 import json
+import hashlib
+import gzip
 from deep_translator import GoogleTranslator
 import logging
 import threading
 import time
 import os
 import sys
+import atexit
 import random
+import heapq
+import bisect
+import queue
+import sqlite3
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from collections import OrderedDict, deque
+from itertools import chain
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 
+try:
+    import brotli  # 選用：安裝後 /api/subtitles 也提供 br 壓縮
+except ImportError:
+    brotli = None
+
 app = Flask(__name__)
 CORS(app)
 
@@ -30,17 +50,24 @@ else:
 # 快取翻譯結果
 translation_cache = {}
 
-# 翻譯進度追蹤（用於多個請求）
-translation_progress = {}
-
 # 單字庫文件路徑（與 exe 同層）
 WORD_BANK_FILE = os.path.join(BASE_DIR, 'word_banks.json')
 
-# 字幕緩存文件路徑（與 exe 同層）
+# 字幕緩存目錄（每部影片一個文件，與 exe 同層）
+SUBTITLE_CACHE_DIR = os.path.join(BASE_DIR, 'subtitle_cache')
+
+# 字幕抓取失敗記錄目錄（負面緩存，與 exe 同層）
+SUBTITLE_FAILURE_DIR = os.path.join(BASE_DIR, 'subtitle_failures')
+
+# 舊版單一字幕緩存文件（啟動時一次性拆分到 SUBTITLE_CACHE_DIR）
 SUBTITLE_CACHE_FILE = os.path.join(BASE_DIR, 'subtitle_cache.json')
 
-# 翻譯緩存文件路徑（與 exe 同層）
+# 翻譯緩存文件路徑（與 exe 同層）：快照 + 追加式 JSONL 日誌
 TRANSLATION_CACHE_FILE = os.path.join(BASE_DIR, 'translation_cache.json')
+TRANSLATION_CACHE_LOG_FILE = os.path.join(BASE_DIR, 'translation_cache.jsonl')
+
+# 單字資訊緩存資料庫（與 exe 同層）
+WORD_INFO_CACHE_FILE = os.path.join(BASE_DIR, 'word_cache.db')
 
 # 用戶資料文件路徑（與 exe 同層）
 USER_DATA_FILE = os.path.join(BASE_DIR, 'user_data.json')
@@ -48,146 +75,934 @@ USER_DATA_FILE = os.path.join(BASE_DIR, 'user_data.json')
 # 書籤文件路徑（與 exe 同層）
 BOOKMARKS_FILE = os.path.join(BASE_DIR, 'bookmarks.json')
 
-def load_subtitle_cache():
-    """載入字幕緩存數據"""
-    if os.path.exists(SUBTITLE_CACHE_FILE):
+# player client 成功率統計文件（與 exe 同層）
+PLAYER_CLIENT_STATS_FILE = os.path.join(BASE_DIR, 'player_client_stats.json')
+
+# 語音音頻緩存目錄（與 exe 同層）
+TTS_CACHE_DIR = os.path.join(BASE_DIR, 'tts_cache')
+
+# 跨進程文件鎖目錄（與 exe 同層）
+LOCK_DIR = os.path.join(BASE_DIR, '.locks')
+
+def safe_filename(key, suffix):
+    """將任意字串轉為安全的文件名（非標準字元以雜湊避免路徑問題）"""
+    if re.fullmatch(r'[A-Za-z0-9_-]{1,64}', key):
+        return f'{key}{suffix}'
+    return f'_{hashlib.sha1(key.encode("utf-8")).hexdigest()}{suffix}'
+
+class SubtitleCache:
+    """分片字幕緩存：每部影片一個文件，並在記憶體中維護已緩存影片的索引"""
+
+    MIGRATED_MARKER = '.migrated'
+
+    def __init__(self, cache_dir, legacy_file=None):
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        if legacy_file:
+            self._migrate_legacy(legacy_file)
+        self._index = self._scan()
+
+    @staticmethod
+    def _shard_name(video_id):
+        return safe_filename(video_id, '.json')
+
+    def _shard_path(self, video_id):
+        return os.path.join(self.cache_dir, self._shard_name(video_id))
+
+    def version(self, video_id):
+        """緩存分片的版本（修改時間與大小），未緩存時返回 None"""
+        if video_id not in self:
+            return None
+        try:
+            stat = os.stat(self._shard_path(video_id))
+        except OSError:
+            return None
+        return f'{stat.st_mtime_ns:x}-{stat.st_size:x}'
+
+    def _scan(self):
+        """啟動時建立索引（只列目錄，不讀文件內容）"""
+        with os.scandir(self.cache_dir) as entries:
+            return {entry.name for entry in entries if entry.name.endswith('.json')}
+
+    def _write_shard(self, video_id, entry):
+        path = self._shard_path(video_id)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    def _migrate_legacy(self, legacy_file):
+        """一次性將舊的 subtitle_cache.json 拆分為分片文件"""
+        marker = os.path.join(self.cache_dir, self.MIGRATED_MARKER)
+        if os.path.exists(marker) or not os.path.exists(legacy_file):
+            return
+        try:
+            with open(legacy_file, 'r', encoding='utf-8') as f:
+                legacy_cache = json.load(f)
+            for video_id, entry in legacy_cache.items():
+                if not os.path.exists(self._shard_path(video_id)):
+                    self._write_shard(video_id, entry)
+            with open(marker, 'w', encoding='utf-8') as f:
+                f.write(datetime.now().isoformat())
+            logger.info(f"[字幕緩存] 已將 {len(legacy_cache)} 部影片的舊緩存拆分為分片文件")
+        except Exception as e:
+            logger.error(f"[字幕緩存] 舊緩存轉換失敗: {e}")
+
+    def __contains__(self, video_id):
+        name = self._shard_name(video_id)
+        if name in self._index:
+            return True
+        # 其他 worker 可能剛寫入，索引未命中時再確認一次
+        if os.path.exists(os.path.join(self.cache_dir, name)):
+            self._index.add(name)
+            return True
+        return False
+
+    def get(self, video_id):
+        """讀取單部影片的緩存（未緩存時返回 None）"""
+        if video_id not in self:
+            return None
         try:
-            with open(SUBTITLE_CACHE_FILE, 'r', encoding='utf-8') as f:
+            with open(self._shard_path(video_id), 'r', encoding='utf-8') as f:
                 return json.load(f)
+        except FileNotFoundError:
+            self._index.discard(self._shard_name(video_id))
+            return None
         except Exception as e:
             logger.error(f"[字幕緩存] 載入失敗: {e}")
-            return {}
-    return {}
+            return None
 
-def save_subtitle_cache(cache):
-    """保存字幕緩存數據"""
-    try:
-        with open(SUBTITLE_CACHE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(cache, f, ensure_ascii=False, indent=2)
-        return True
-    except Exception as e:
-        logger.error(f"[字幕緩存] 保存失敗: {e}")
-        return False
+    def put(self, video_id, subtitles):
+        """寫入單部影片的緩存（只寫入該影片的分片）"""
+        entry = {
+            'subtitles': subtitles,
+            'cached_at': datetime.now().isoformat()
+        }
+        try:
+            with self._lock:
+                self._write_shard(video_id, entry)
+                self._index.add(self._shard_name(video_id))
+            return True
+        except Exception as e:
+            logger.error(f"[字幕緩存] 保存失敗: {e}")
+            return False
+
+    def __len__(self):
+        return len(self._index)
+
+
+subtitle_cache = SubtitleCache(SUBTITLE_CACHE_DIR, legacy_file=SUBTITLE_CACHE_FILE)
+
+
+class SubtitleFailureCache:
+    """字幕抓取失敗的負面緩存：記錄失敗原因與到期時間，避免重複執行完整的抓取流程
+
+    沒有英文字幕的影片保留較久，被限流或反爬蟲攔截時只保留較短時間。
+    每部影片一個小文件，讓所有 worker 共用；不在記憶體中保留副本，
+    任意影片 ID 的請求不會讓 worker 的記憶體無限增長，其他 worker 清除的記錄也能立即生效。
+    """
+
+    NO_CAPTIONS = 'no_captions'  # 影片沒有英文字幕
+    BLOCKED = 'blocked'          # 429 / 反爬蟲
+    ERROR = 'error'              # 其他錯誤（網路等）
+
+    def __init__(self, cache_dir, ttls):
+        self.cache_dir = cache_dir
+        self.ttls = ttls
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, video_id):
+        return os.path.join(self.cache_dir, safe_filename(video_id, '.json'))
+
+    def get(self, video_id):
+        """返回未過期的失敗記錄（{'kind', 'reason', 'expires_at'}），沒有時返回 None"""
+        try:
+            with open(self._path(video_id), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"[字幕緩存] 讀取失敗記錄失敗: {e}")
+            return None
+        if entry['expires_at'] <= time.time():
+            self.discard(video_id)
+            return None
+        return entry
+
+    def put(self, video_id, kind, reason):
+        ttl = self.ttls.get(kind, self.ttls[self.ERROR])
+        entry = {'kind': kind, 'reason': reason, 'expires_at': time.time() + ttl}
+        try:
+            path = self._path(video_id)
+            tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"[字幕緩存] 保存失敗記錄失敗: {e}")
+        logger.info(f"[字幕緩存] 記錄抓取失敗 ({kind})，{ttl:.0f} 秒內不再重試，video_id: {video_id}")
+
+    def discard(self, video_id):
+        try:
+            os.remove(self._path(video_id))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"[字幕緩存] 刪除失敗記錄失敗: {e}")
+
+
+subtitle_failures = SubtitleFailureCache(SUBTITLE_FAILURE_DIR, ttls={
+    SubtitleFailureCache.NO_CAPTIONS: float(os.environ.get('SUBTITLE_NO_CAPTIONS_TTL', 7 * 24 * 3600)),
+    SubtitleFailureCache.BLOCKED: float(os.environ.get('SUBTITLE_BLOCKED_TTL', 600)),
+    SubtitleFailureCache.ERROR: float(os.environ.get('SUBTITLE_ERROR_TTL', 120)),
+})
+
+
+class FileLock:
+    """跨進程文件鎖（gunicorn 多個 worker 共用同一份文件時使用）"""
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.Lock()
+        self._fd = None
+
+    @staticmethod
+    def _lock_fd(fd):
+        if os.name == 'nt':
+            import msvcrt
+            while True:
+                try:
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                    return
+                except OSError:
+                    time.sleep(0.05)
+        else:
+            import fcntl
+            fcntl.flock(fd, fcntl.LOCK_EX)
+
+    @staticmethod
+    def _unlock_fd(fd):
+        if os.name == 'nt':
+            import msvcrt
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def acquire(self):
+        self._thread_lock.acquire()
+        try:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                self._lock_fd(fd)
+            except BaseException:
+                os.close(fd)
+                raise
+        except BaseException:
+            self._thread_lock.release()
+            raise
+        self._fd = fd
+
+    def release(self):
+        fd, self._fd = self._fd, None
+        try:
+            self._unlock_fd(fd)
+        finally:
+            os.close(fd)
+            self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class SingleFlight:
+    """同一 key 的並發呼叫只執行一次，其餘呼叫等待並共用結果
+
+    指定 lock_dir 時，執行期間另持有該 key 的文件鎖，讓其他 worker 進程的同一 key 排隊等待；
+    被呼叫的函數應在開始時重新檢查共用緩存，以便直接使用其他進程的結果。
+    """
+
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self, lock_dir=None):
+        self.lock_dir = lock_dir
+        self._lock = threading.Lock()
+        self._calls = {}
+        if lock_dir:
+            os.makedirs(lock_dir, exist_ok=True)
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+
+        if not leader:
+            logger.info(f"[單次執行] 等待進行中的相同請求: {key}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            if self.lock_dir:
+                with FileLock(os.path.join(self.lock_dir, safe_filename(key, '.lock'))):
+                    call.result = func()
+            else:
+                call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class TranslationCacheStore:
+    """翻譯緩存的延遲寫入：新翻譯先進入待寫集合，由單一背景執行緒批次追加到 JSONL 日誌，
+    日誌過長時再壓縮回快照文件"""
+
+    def __init__(self, cache, snapshot_file, log_file, flush_interval=5.0, flush_size=200, compact_lines=5000):
+        self.cache = cache
+        self.snapshot_file = snapshot_file
+        self.log_file = log_file
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.compact_lines = compact_lines
+        self._file_lock = FileLock(f'{snapshot_file}.lock')
+        self._lock = threading.Lock()
+        self._dirty = {}
+        self._log_lines = 0
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._flusher = None
+
+    def load(self):
+        """載入快照文件並重播 JSONL 日誌"""
+        with self._file_lock:
+            if os.path.exists(self.snapshot_file):
+                try:
+                    with open(self.snapshot_file, 'r', encoding='utf-8') as f:
+                        self.cache.update(json.load(f))
+                except Exception as e:
+                    logger.error(f"[翻譯緩存] 載入失敗: {e}")
+            self._log_lines = self._replay_log(self.cache)
+        return self.cache
+
+    def _replay_log(self, target):
+        """將日誌內容合併到 target，返回日誌行數"""
+        if not os.path.exists(self.log_file):
+            return 0
+        count = 0
+        with open(self.log_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    english_text, chinese_text = json.loads(line)
+                except ValueError:
+                    continue  # 寫入中斷造成的殘行
+                target[english_text] = chinese_text
+                count += 1
+        return count
+
+    def record(self, english_text, chinese_text):
+        """記錄一條新翻譯（立即寫入記憶體，稍後批次寫入磁碟）"""
+        self.cache[english_text] = chinese_text
+        with self._lock:
+            self._dirty[english_text] = chinese_text
+            pending = len(self._dirty)
+            if self._flusher is None and not self._stopped:
+                self._flusher = threading.Thread(target=self._run, name='translation-cache-flusher', daemon=True)
+                self._flusher.start()
+        if pending >= self.flush_size:
+            self._wakeup.set()
+
+    def _run(self):
+        while not self._stopped:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        """將待寫入的翻譯追加到日誌（成本與新增條數成正比）"""
+        with self._lock:
+            batch, self._dirty = self._dirty, {}
+        if not batch:
+            return True
+        try:
+            payload = ''.join(
+                json.dumps([english_text, chinese_text], ensure_ascii=False) + '\n'
+                for english_text, chinese_text in batch.items()
+            )
+            with self._file_lock:
+                with open(self.log_file, 'a', encoding='utf-8') as f:
+                    f.write(payload)
+                self._log_lines += len(batch)
+                if self._log_lines >= self.compact_lines:
+                    self._compact()
+            logger.info(f"[翻譯緩存] 已寫入 {len(batch)} 條新翻譯")
+            return True
+        except Exception as e:
+            logger.error(f"[翻譯緩存] 保存失敗: {e}")
+            # 寫入失敗時放回待寫集合，下次再試
+            with self._lock:
+                for english_text, chinese_text in batch.items():
+                    self._dirty.setdefault(english_text, chinese_text)
+            return False
+
+    def _compact(self):
+        """把快照與日誌合併為新快照並清空日誌（呼叫端需持有文件鎖）"""
+        merged = {}
+        if os.path.exists(self.snapshot_file):
+            with open(self.snapshot_file, 'r', encoding='utf-8') as f:
+                merged.update(json.load(f))
+        merged.update(self.cache)
+        self._replay_log(merged)  # 其他 worker 追加的翻譯也一併保留
+        tmp_path = f'{self.snapshot_file}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(merged, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.snapshot_file)
+        open(self.log_file, 'w').close()
+        self._log_lines = 0
+        logger.info(f"[翻譯緩存] 日誌已壓縮，快照共 {len(merged)} 條翻譯")
+
+    def close(self):
+        """停止背景執行緒並寫入所有待寫翻譯（程序結束時呼叫）"""
+        self._stopped = True
+        self._wakeup.set()
+        flusher = self._flusher
+        if flusher is not None and flusher is not threading.current_thread():
+            flusher.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+
+translation_store = TranslationCacheStore(
+    translation_cache,
+    TRANSLATION_CACHE_FILE,
+    TRANSLATION_CACHE_LOG_FILE,
+    flush_interval=float(os.environ.get('TRANSLATION_CACHE_FLUSH_INTERVAL', 5)),
+    flush_size=int(os.environ.get('TRANSLATION_CACHE_FLUSH_SIZE', 200)),
+    compact_lines=int(os.environ.get('TRANSLATION_CACHE_COMPACT_LINES', 5000))
+)
+atexit.register(translation_store.close)
 
 def load_translation_cache():
     """載入翻譯緩存數據"""
     if translation_cache:  # 如果內存中已有緩存，先返回
         return translation_cache
-    
-    if os.path.exists(TRANSLATION_CACHE_FILE):
+    return translation_store.load()
+
+def save_translation_cache():
+    """立即寫入尚未保存的翻譯緩存"""
+    return translation_store.flush()
+
+# 儲存後端：json 為舊版整檔讀寫；sqlite 使用 WAL 模式，逐列讀寫
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'sqlite').strip().lower()
+
+# SQLite 資料庫路徑（與 exe 同層）
+DATABASE_FILE = os.environ.get('DATABASE_FILE') or os.path.join(BASE_DIR, 'app_data.db')
+
+
+def _new_word_bank(now=None):
+    """建立空白單字庫結構"""
+    now = now or datetime.now().isoformat()
+    return {
+        'words': {},
+        'created_at': now,
+        'updated_at': now
+    }
+
+
+class JsonStorage:
+    """JSON 文件儲存後端（每次操作讀寫整個文件）"""
+
+    name = 'json'
+
+    def __init__(self, word_bank_file, user_data_file, bookmarks_file):
+        self.word_bank_file = word_bank_file
+        self.user_data_file = user_data_file
+        self.bookmarks_file = bookmarks_file
+        self._lock = threading.RLock()
+
+    def _load(self, path, label):
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                logger.error(f"[{label}] 載入失敗: {e}")
+                return {}
+        return {}
+
+    def _save(self, path, data, label):
         try:
-            with open(TRANSLATION_CACHE_FILE, 'r', encoding='utf-8') as f:
-                cache = json.load(f)
-                translation_cache.update(cache)  # 更新內存緩存
-                return cache
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            return True
         except Exception as e:
-            logger.error(f"[翻譯緩存] 載入失敗: {e}")
-            return {}
-    return {}
+            logger.error(f"[{label}] 保存失敗: {e}")
+            return False
+
+    # ---- 單字庫 ----
+    def load_word_banks(self):
+        with self._lock:
+            return self._load(self.word_bank_file, '單字庫')
+
+    def save_word_banks(self, word_banks):
+        with self._lock:
+            return self._save(self.word_bank_file, word_banks, '單字庫')
+
+    def list_word_banks(self, prefix):
+        """返回指定前綴的單字庫 [(名稱, 單字庫資料, 單字數)]"""
+        return [
+            (name, bank, len(bank.get('words', {})))
+            for name, bank in self.load_word_banks().items()
+            if name.startswith(prefix)
+        ]
+
+    def has_word_bank(self, bank_name):
+        return bank_name in self.load_word_banks()
+
+    def get_word_bank(self, bank_name):
+        return self.load_word_banks().get(bank_name)
+
+    def save_word_bank(self, bank_name, bank_data):
+        with self._lock:
+            word_banks = self.load_word_banks()
+            word_banks[bank_name] = bank_data
+            return self.save_word_banks(word_banks)
+
+    def delete_word_bank(self, bank_name):
+        with self._lock:
+            word_banks = self.load_word_banks()
+            word_banks.pop(bank_name, None)
+            return self.save_word_banks(word_banks)
+
+    def get_word(self, bank_name, word):
+        bank = self.get_word_bank(bank_name)
+        if bank is None:
+            return None
+        return bank.get('words', {}).get(word)
+
+    def save_word(self, bank_name, word, word_data, updated_at):
+        """新增或更新單字（單字庫不存在時自動建立）"""
+        with self._lock:
+            word_banks = self.load_word_banks()
+            bank = word_banks.setdefault(bank_name, _new_word_bank(updated_at))
+            bank.setdefault('words', {})[word] = word_data
+            bank['updated_at'] = updated_at
+            return self.save_word_banks(word_banks)
+
+    def delete_word(self, bank_name, word, updated_at):
+        with self._lock:
+            word_banks = self.load_word_banks()
+            bank = word_banks.get(bank_name)
+            if bank is None or word not in bank.get('words', {}):
+                return False
+            del bank['words'][word]
+            bank['updated_at'] = updated_at
+            return self.save_word_banks(word_banks)
+
+    # ---- 用戶資料 ----
+    def load_user_data(self):
+        with self._lock:
+            return self._load(self.user_data_file, '用戶資料')
+
+    def save_user_data(self, user_data):
+        with self._lock:
+            return self._save(self.user_data_file, user_data, '用戶資料')
+
+    def get_user(self, nickname):
+        return self.load_user_data().get(nickname)
+
+    def save_user(self, nickname, data):
+        with self._lock:
+            user_data = self.load_user_data()
+            user_data[nickname] = data
+            return self.save_user_data(user_data)
+
+    # ---- 書籤 ----
+    def load_bookmarks(self):
+        with self._lock:
+            return self._load(self.bookmarks_file, '書籤')
+
+    def save_bookmarks(self, bookmarks):
+        with self._lock:
+            return self._save(self.bookmarks_file, bookmarks, '書籤')
+
+    def get_user_bookmarks(self, nickname):
+        return self.load_bookmarks().get(nickname)
+
+    def save_user_bookmarks(self, nickname, bookmarks):
+        with self._lock:
+            bookmarks_data = self.load_bookmarks()
+            bookmarks_data[nickname] = bookmarks
+            return self.save_bookmarks(bookmarks_data)
+
+
+def connect_sqlite(path):
+    """開啟 SQLite 連線（WAL 模式，自動提交，由呼叫端以 BEGIN 控制交易）"""
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA busy_timeout=30000')
+    return conn
+
+
+class SqliteStorage:
+    """SQLite 儲存後端（WAL 模式，單字、用戶、書籤皆為逐列讀寫）"""
+
+    name = 'sqlite'
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+        CREATE TABLE IF NOT EXISTS word_banks (
+            name TEXT PRIMARY KEY,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS words (
+            bank_name TEXT NOT NULL,
+            word TEXT NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (bank_name, word)
+        );
+        CREATE TABLE IF NOT EXISTS users (
+            nickname TEXT PRIMARY KEY,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS bookmarks (
+            nickname TEXT PRIMARY KEY,
+            data TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._conn().executescript(self.SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = connect_sqlite(self.path)
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """寫入交易（BEGIN IMMEDIATE 取得寫鎖，避免多個 worker 互相覆蓋）"""
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        else:
+            conn.execute('COMMIT')
+
+    def _write(self, label, func, *args):
+        """執行寫入操作，失敗時記錄日誌並返回 False（與 JSON 後端一致）"""
+        try:
+            with self.transaction() as conn:
+                result = func(conn, *args)
+            return True if result is None else result
+        except Exception as e:
+            logger.error(f"[{label}] 保存失敗: {e}")
+            return False
+
+    @staticmethod
+    def _dumps(data):
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+    # ---- 單字庫 ----
+    def _bank_meta(self, bank_name):
+        row = self._conn().execute('SELECT data FROM word_banks WHERE name = ?', (bank_name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _words(self, bank_name):
+        rows = self._conn().execute(
+            'SELECT word, data FROM words WHERE bank_name = ? ORDER BY rowid', (bank_name,)
+        )
+        return {word: json.loads(data) for word, data in rows}
+
+    @classmethod
+    def _put_bank(cls, conn, bank_name, bank_data):
+        bank_meta = {k: v for k, v in bank_data.items() if k != 'words'}
+        conn.execute(
+            'INSERT INTO word_banks (name, data) VALUES (?, ?) '
+            'ON CONFLICT(name) DO UPDATE SET data = excluded.data',
+            (bank_name, cls._dumps(bank_meta))
+        )
+        conn.execute('DELETE FROM words WHERE bank_name = ?', (bank_name,))
+        conn.executemany(
+            'INSERT INTO words (bank_name, word, data) VALUES (?, ?, ?)',
+            [(bank_name, word, cls._dumps(data)) for word, data in bank_data.get('words', {}).items()]
+        )
+
+    @staticmethod
+    def _touch_bank(conn, bank_name, updated_at):
+        """更新單字庫的 updated_at（不存在時建立）"""
+        row = conn.execute('SELECT data FROM word_banks WHERE name = ?', (bank_name,)).fetchone()
+        bank_meta = json.loads(row[0]) if row else _new_word_bank(updated_at)
+        bank_meta.pop('words', None)
+        bank_meta['updated_at'] = updated_at
+        conn.execute(
+            'INSERT INTO word_banks (name, data) VALUES (?, ?) '
+            'ON CONFLICT(name) DO UPDATE SET data = excluded.data',
+            (bank_name, SqliteStorage._dumps(bank_meta))
+        )
+
+    def load_word_banks(self):
+        word_banks = {}
+        for name, data in self._conn().execute('SELECT name, data FROM word_banks ORDER BY rowid'):
+            word_banks[name] = dict(json.loads(data), words={})
+        for bank_name, word, data in self._conn().execute('SELECT bank_name, word, data FROM words ORDER BY rowid'):
+            if bank_name in word_banks:
+                word_banks[bank_name]['words'][word] = json.loads(data)
+        return word_banks
+
+    def save_word_banks(self, word_banks):
+        def _replace_all(conn):
+            conn.execute('DELETE FROM words')
+            conn.execute('DELETE FROM word_banks')
+            for bank_name, bank_data in word_banks.items():
+                self._put_bank(conn, bank_name, bank_data)
+        return self._write('單字庫', _replace_all)
+
+    def list_word_banks(self, prefix):
+        # 以範圍查詢取代 LIKE，避免暱稱中的 % 或 _ 被當作萬用字元
+        rows = self._conn().execute(
+            'SELECT b.name, b.data, (SELECT COUNT(*) FROM words w WHERE w.bank_name = b.name) '
+            'FROM word_banks b WHERE b.name >= ? AND b.name < ? ORDER BY b.rowid',
+            (prefix, prefix + '\U0010ffff')
+        )
+        return [(name, json.loads(data), count) for name, data, count in rows if name.startswith(prefix)]
+
+    def has_word_bank(self, bank_name):
+        return self._bank_meta(bank_name) is not None
+
+    def get_word_bank(self, bank_name):
+        bank_meta = self._bank_meta(bank_name)
+        if bank_meta is None:
+            return None
+        bank_meta['words'] = self._words(bank_name)
+        return bank_meta
+
+    def save_word_bank(self, bank_name, bank_data):
+        return self._write('單字庫', self._put_bank, bank_name, bank_data)
+
+    def delete_word_bank(self, bank_name):
+        def _delete(conn):
+            conn.execute('DELETE FROM words WHERE bank_name = ?', (bank_name,))
+            conn.execute('DELETE FROM word_banks WHERE name = ?', (bank_name,))
+        return self._write('單字庫', _delete)
+
+    def get_word(self, bank_name, word):
+        row = self._conn().execute(
+            'SELECT data FROM words WHERE bank_name = ? AND word = ?', (bank_name, word)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_word(self, bank_name, word, word_data, updated_at):
+        def _upsert(conn):
+            self._touch_bank(conn, bank_name, updated_at)
+            conn.execute(
+                'INSERT INTO words (bank_name, word, data) VALUES (?, ?, ?) '
+                'ON CONFLICT(bank_name, word) DO UPDATE SET data = excluded.data',
+                (bank_name, word, self._dumps(word_data))
+            )
+        return self._write('單字庫', _upsert)
+
+    def delete_word(self, bank_name, word, updated_at):
+        def _delete(conn):
+            cursor = conn.execute('DELETE FROM words WHERE bank_name = ? AND word = ?', (bank_name, word))
+            if cursor.rowcount == 0:
+                return False
+            self._touch_bank(conn, bank_name, updated_at)
+            return True
+        return self._write('單字庫', _delete)
+
+    # ---- 用戶資料 ----
+    def load_user_data(self):
+        rows = self._conn().execute('SELECT nickname, data FROM users ORDER BY rowid')
+        return {nickname: json.loads(data) for nickname, data in rows}
+
+    def save_user_data(self, user_data):
+        def _replace_all(conn):
+            conn.execute('DELETE FROM users')
+            conn.executemany(
+                'INSERT INTO users (nickname, data) VALUES (?, ?)',
+                [(nickname, self._dumps(data)) for nickname, data in user_data.items()]
+            )
+        return self._write('用戶資料', _replace_all)
+
+    def get_user(self, nickname):
+        row = self._conn().execute('SELECT data FROM users WHERE nickname = ?', (nickname,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_user(self, nickname, data):
+        def _upsert(conn):
+            conn.execute(
+                'INSERT INTO users (nickname, data) VALUES (?, ?) '
+                'ON CONFLICT(nickname) DO UPDATE SET data = excluded.data',
+                (nickname, self._dumps(data))
+            )
+        return self._write('用戶資料', _upsert)
+
+    # ---- 書籤 ----
+    def load_bookmarks(self):
+        rows = self._conn().execute('SELECT nickname, data FROM bookmarks ORDER BY rowid')
+        return {nickname: json.loads(data) for nickname, data in rows}
+
+    def save_bookmarks(self, bookmarks):
+        def _replace_all(conn):
+            conn.execute('DELETE FROM bookmarks')
+            conn.executemany(
+                'INSERT INTO bookmarks (nickname, data) VALUES (?, ?)',
+                [(nickname, self._dumps(data)) for nickname, data in bookmarks.items()]
+            )
+        return self._write('書籤', _replace_all)
+
+    def get_user_bookmarks(self, nickname):
+        row = self._conn().execute('SELECT data FROM bookmarks WHERE nickname = ?', (nickname,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_user_bookmarks(self, nickname, bookmarks):
+        def _upsert(conn):
+            conn.execute(
+                'INSERT INTO bookmarks (nickname, data) VALUES (?, ?) '
+                'ON CONFLICT(nickname) DO UPDATE SET data = excluded.data',
+                (nickname, self._dumps(bookmarks))
+            )
+        return self._write('書籤', _upsert)
+
+
+def migrate_json_to_sqlite(sqlite_storage, json_storage, force=False):
+    """一次性將 JSON 文件資料匯入 SQLite（已匯入過則略過，force=True 時強制覆蓋）"""
+    with sqlite_storage.transaction() as conn:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'json_migrated_at'").fetchone()
+        if row and not force:
+            return False
+
+        word_banks = json_storage.load_word_banks()
+        user_data = json_storage.load_user_data()
+        bookmarks = json_storage.load_bookmarks()
+
+        conn.execute('DELETE FROM words')
+        conn.execute('DELETE FROM word_banks')
+        for bank_name, bank_data in word_banks.items():
+            SqliteStorage._put_bank(conn, bank_name, bank_data)
+
+        conn.execute('DELETE FROM users')
+        conn.executemany(
+            'INSERT INTO users (nickname, data) VALUES (?, ?)',
+            [(nickname, SqliteStorage._dumps(data)) for nickname, data in user_data.items()]
+        )
+
+        conn.execute('DELETE FROM bookmarks')
+        conn.executemany(
+            'INSERT INTO bookmarks (nickname, data) VALUES (?, ?)',
+            [(nickname, SqliteStorage._dumps(data)) for nickname, data in bookmarks.items()]
+        )
+
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated_at', ?)",
+            (datetime.now().isoformat(),)
+        )
+
+    logger.info(f"[資料庫] 已從 JSON 匯入 {len(word_banks)} 個單字庫、{len(user_data)} 位用戶、{len(bookmarks)} 位用戶的書籤")
+    return True
+
+
+def create_storage(backend=STORAGE_BACKEND):
+    """依設定建立儲存後端（sqlite 首次啟動時自動匯入舊的 JSON 文件）"""
+    json_storage = JsonStorage(WORD_BANK_FILE, USER_DATA_FILE, BOOKMARKS_FILE)
+    if backend == 'json':
+        logger.info("[資料庫] 使用 JSON 文件儲存")
+        return json_storage
+    if backend != 'sqlite':
+        logger.warning(f"[資料庫] 未知的 STORAGE_BACKEND: {backend}，改用 sqlite")
+
+    sqlite_storage = SqliteStorage(DATABASE_FILE)
+    migrate_json_to_sqlite(sqlite_storage, json_storage)
+    logger.info(f"[資料庫] 使用 SQLite 儲存: {DATABASE_FILE}")
+    return sqlite_storage
+
+
+storage = create_storage()
 
-def save_translation_cache():
-    """保存翻譯緩存數據"""
-    try:
-        with open(TRANSLATION_CACHE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(translation_cache, f, ensure_ascii=False, indent=2)
-        return True
-    except Exception as e:
-        logger.error(f"[翻譯緩存] 保存失敗: {e}")
-        return False
 
 def load_word_banks():
     """載入單字庫數據"""
-    if os.path.exists(WORD_BANK_FILE):
-        try:
-            with open(WORD_BANK_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"[單字庫] 載入失敗: {e}")
-            return {}
-    return {}
+    return storage.load_word_banks()
 
 def save_word_banks(word_banks):
     """保存單字庫數據"""
-    try:
-        with open(WORD_BANK_FILE, 'w', encoding='utf-8') as f:
-            json.dump(word_banks, f, ensure_ascii=False, indent=2)
-        return True
-    except Exception as e:
-        logger.error(f"[單字庫] 保存失敗: {e}")
-        return False
+    return storage.save_word_banks(word_banks)
 
 def load_user_data():
     """載入用戶資料數據"""
-    if os.path.exists(USER_DATA_FILE):
-        try:
-            with open(USER_DATA_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"[用戶資料] 載入失敗: {e}")
-            return {}
-    return {}
+    return storage.load_user_data()
 
 def save_user_data(user_data):
     """保存用戶資料數據"""
-    try:
-        with open(USER_DATA_FILE, 'w', encoding='utf-8') as f:
-            json.dump(user_data, f, ensure_ascii=False, indent=2)
-        return True
-    except Exception as e:
-        logger.error(f"[用戶資料] 保存失敗: {e}")
-        return False
+    return storage.save_user_data(user_data)
 
 def load_bookmarks():
     """載入書籤數據"""
-    if os.path.exists(BOOKMARKS_FILE):
-        try:
-            with open(BOOKMARKS_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"[書籤] 載入失敗: {e}")
-            return {}
-    return {}
+    return storage.load_bookmarks()
 
 def save_bookmarks(bookmarks):
     """保存書籤數據"""
-    try:
-        with open(BOOKMARKS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(bookmarks, f, ensure_ascii=False, indent=2)
-        return True
-    except Exception as e:
-        logger.error(f"[書籤] 保存失敗: {e}")
-        return False
+    return storage.save_bookmarks(bookmarks)
+
+def _new_user_stats():
+    """初始化新用戶資料"""
+    return {
+        'learning_time': 0,  # 學習時間（秒）
+        'videos_watched': 0,  # 觀看的影片數量
+        'words_added': 0,     # 添加的單字數量
+        'review_sessions': 0, # 複習次數
+        'review_correct': 0,  # 複習正確數量
+        'review_total': 0,    # 複習總數量
+        'last_active': datetime.now().isoformat(),
+        'created_at': datetime.now().isoformat()
+    }
 
 def get_user_stats(nickname):
     """獲取用戶學習統計"""
-    user_data = load_user_data()
-    if nickname not in user_data:
-        # 初始化新用戶資料
-        user_data[nickname] = {
-            'learning_time': 0,  # 學習時間（秒）
-            'videos_watched': 0,  # 觀看的影片數量
-            'words_added': 0,     # 添加的單字數量
-            'review_sessions': 0, # 複習次數
-            'review_correct': 0,  # 複習正確數量
-            'review_total': 0,    # 複習總數量
-            'last_active': datetime.now().isoformat(),
-            'created_at': datetime.now().isoformat()
-        }
-        save_user_data(user_data)
+    user = storage.get_user(nickname)
+    if user is None:
+        user = _new_user_stats()
+        storage.save_user(nickname, user)
 
-    return user_data[nickname]
+    return user
 
 def update_user_stats(nickname, stats_update):
     """更新用戶統計資料"""
-    user_data = load_user_data()
-    if nickname not in user_data:
-        user_data[nickname] = get_user_stats(nickname)
+    user = get_user_stats(nickname)
 
-    user_data[nickname].update(stats_update)
-    user_data[nickname]['last_active'] = datetime.now().isoformat()
+    user.update(stats_update)
+    user['last_active'] = datetime.now().isoformat()
 
-    save_user_data(user_data)
-    return user_data[nickname]
+    storage.save_user(nickname, user)
+    return user
 
 # 應用啟動時載入翻譯緩存（在所有函數定義之後）
 load_translation_cache()
@@ -207,82 +1022,495 @@ def extract_video_id(url):
     return None
 
 
+# 對外 HTTP 連線設定：每個主機的連線池大小、連線逾時、重試次數與退避係數
+HTTP_POOL_SIZE = max(1, int(os.environ.get('HTTP_POOL_SIZE', 10)))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', 5))
+HTTP_RETRIES = max(0, int(os.environ.get('HTTP_RETRIES', 2)))
+HTTP_BACKOFF = float(os.environ.get('HTTP_BACKOFF', 0.5))
+
+
+class HttpClient:
+    """共用的對外 HTTP 連線層（字幕下載、字典查詢、TTS）
+
+    以同一個 requests.Session 保持連線（keep-alive），每個主機有自己的連線池，
+    連線錯誤與 5xx 依退避策略重試（不重試 429，避免加重限流），並記錄各主機的延遲。
+    """
+
+    def __init__(self, pool_size, connect_timeout, retries, backoff):
+        self.connect_timeout = connect_timeout
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=[500, 502, 503, 504],
+            allowed_methods=['GET'],
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def get(self, url, timeout=30, **kwargs):
+        """發送 GET 請求（timeout 為讀取逾時秒數），返回 requests.Response"""
+        host = urlsplit(url).hostname or ''
+        start = time.time()
+        try:
+            response = self.session.get(url, timeout=(self.connect_timeout, timeout), **kwargs)
+        except Exception:
+            self._record(host, time.time() - start, error=True)
+            raise
+        self._record(host, time.time() - start, error=response.status_code >= 500)
+        return response
+
+    def _record(self, host, elapsed, error):
+        with self._lock:
+            stats = self._hosts.setdefault(host, {
+                'requests': 0, 'errors': 0, 'total_seconds': 0.0, 'max_seconds': 0.0, 'recent': deque(maxlen=100)
+            })
+            stats['requests'] += 1
+            stats['errors'] += int(error)
+            stats['total_seconds'] += elapsed
+            stats['max_seconds'] = max(stats['max_seconds'], elapsed)
+            stats['recent'].append(elapsed)
+
+    def stats(self):
+        """各主機的請求數、錯誤數與延遲（毫秒，取得回應標頭的時間）"""
+        with self._lock:
+            result = {}
+            for host, stats in self._hosts.items():
+                recent = sorted(stats['recent'])
+                result[host] = {
+                    'requests': stats['requests'],
+                    'errors': stats['errors'],
+                    'avg_ms': round(stats['total_seconds'] / stats['requests'] * 1000, 1),
+                    'p95_ms': round(recent[min(len(recent) - 1, int(len(recent) * 0.95))] * 1000, 1),
+                    'max_ms': round(stats['max_seconds'] * 1000, 1)
+                }
+            return result
+
+
+http_client = HttpClient(HTTP_POOL_SIZE, HTTP_CONNECT_TIMEOUT, HTTP_RETRIES, HTTP_BACKOFF)
+
+
+# 字幕格式偏好：json3 體積較小且時間為整數毫秒，解析成本最低
+SUBTITLE_FORMAT_PREFERENCE = ['json3', 'vtt', 'srt']
+
+
+def pick_subtitle_format(subtitle_data):
+    """從 yt-dlp 提供的字幕格式列表中選出偏好的格式"""
+    by_ext = {item.get('ext'): item for item in subtitle_data if item.get('url')}
+    for ext in SUBTITLE_FORMAT_PREFERENCE:
+        if ext in by_ext:
+            return by_ext[ext]
+    return subtitle_data[0]
+
+
 def get_subtitle_for_lang(subtitle_data, lang_code):
-    """獲取指定語言的字幕內容"""
-    import urllib.request
-    import time
-    
+    """獲取指定語言的字幕內容（下載或解析失敗時拋出 SubtitleDownloadError，保留原始錯誤訊息）"""
     if not subtitle_data:
         return None
     
-    subtitle_url = subtitle_data[0]['url']
-    
-    # 確保使用 SRT 格式（如果不是，修改 URL）
-    if 'fmt=json3' in subtitle_url or 'fmt=json' in subtitle_url:
-        subtitle_url = subtitle_url.replace('fmt=json3', 'fmt=srt').replace('fmt=json', 'fmt=srt')
+    subtitle_format = pick_subtitle_format(subtitle_data)
+    subtitle_url = subtitle_format['url']
+    logger.info(f"[字幕獲取] {lang_code} 使用字幕格式: {subtitle_format.get('ext', 'unknown')}")
     
     try:
         url_start = time.time()
-        with urllib.request.urlopen(subtitle_url, timeout=30) as response:
-            subtitle_content = response.read().decode('utf-8')
+        with http_client.get(subtitle_url, timeout=30, stream=True) as response:
+            response.raise_for_status()
+            # 直接逐行迭代底層回應（以 \n 分行、保留行尾）：iter_lines() 在 \r\n 被切在
+            # 兩個 chunk 之間時會多產生一個空行，把 CRLF 字幕的區塊提前截斷
+            response.raw.decode_content = True
+            lines = iter(response.raw)
+            
+            # 先讀取第一個非空行判斷格式
+            first_line = b''
+            for first_line in lines:
+                if first_line.strip():
+                    break
+            
+            # 檢查內容格式：JSON（json3）直接轉為字幕，其餘邊下載邊解析
+            if first_line.lstrip().startswith((b'{', b'[')):
+                json_data = json.loads(b''.join(chain([first_line], lines)))
+                cues = iter_json3_cues(json_data)
+            else:
+                cues = iter_subtitle_cues(chain([first_line], lines))
+            parsed = list(segment_sentences(cues))
         url_elapsed = time.time() - url_start
-        logger.info(f"[字幕獲取] {lang_code} 字幕內容獲取成功，耗時 {url_elapsed:.2f} 秒，內容長度: {len(subtitle_content)} 字元")
-        
-        # 檢查內容格式
-        if subtitle_content.strip().startswith('{') or subtitle_content.strip().startswith('['):
-            logger.warning(f"[字幕獲取] {lang_code} 收到 JSON 格式，嘗試轉換...")
-            import json
-            json_data = json.loads(subtitle_content)
-            subtitle_content = convert_json_to_srt(json_data)
-            logger.info(f"[字幕獲取] {lang_code} JSON 轉換為 SRT 完成")
-        
-        parsed = parse_subtitle_content(subtitle_content)
-        logger.info(f"[字幕獲取] {lang_code} 字幕解析完成，解析出 {len(parsed)} 條字幕")
+        logger.info(f"[字幕獲取] {lang_code} 字幕下載並解析完成，耗時 {url_elapsed:.2f} 秒，解析出 {len(parsed)} 條字幕")
         return parsed
     except Exception as e:
         logger.warning(f"[字幕獲取] {lang_code} 字幕獲取失敗: {e}")
-        return None
+        raise SubtitleDownloadError(f"{lang_code} 字幕下載失敗: {e}") from e
 
 
-def get_subtitles(video_id):
-    """使用 yt-dlp 獲取英文字幕和中文字幕（先檢查緩存）"""
-    # 先檢查緩存
-    subtitle_cache = load_subtitle_cache()
-    if video_id in subtitle_cache:
-        cached_data = subtitle_cache[video_id]
+# 字幕抓取的單次執行（同一影片同時只抓取一次，跨 worker 以文件鎖協調）
+subtitle_fetches = SingleFlight(LOCK_DIR)
+
+
+def get_cached_subtitles(video_id):
+    """從緩存讀取字幕（未緩存時返回 None）"""
+    cached_data = subtitle_cache.get(video_id)
+    if cached_data is not None:
         logger.info(f"[字幕緩存] 找到緩存字幕，video_id: {video_id}")
         return cached_data.get('subtitles', None)
+    return None
+
+
+def get_subtitles(video_id):
+    """獲取英文字幕和中文字幕（先檢查緩存）
+
+    同一影片的並發請求（包括其他 gunicorn worker）只會執行一次 yt-dlp 抓取，其餘請求等待並共用結果。
+    """
+    subtitles = get_cached_subtitles(video_id)
+    if subtitles is not None:
+        return subtitles
+    if subtitle_failures.get(video_id) is not None:
+        return None
+
+    def load_or_fetch():
+        # 取得鎖後再檢查一次：等待期間其他 worker 可能已抓取完成（或記錄失敗）
+        subtitles = get_cached_subtitles(video_id)
+        if subtitles is not None:
+            return subtitles
+        if subtitle_failures.get(video_id) is not None:
+            return None
+        return fetch_subtitles(video_id)
+
+    return subtitle_fetches.do(video_id, load_or_fetch)
+
+
+# 預設嘗試順序的 player client：優先使用移動端 client，因為它們較少觸發反爬蟲機制
+# （實際順序由 player_client_stats 依觀察到的成功率調整）
+PLAYER_CLIENTS = ['android', 'ios', 'android_embedded', 'tv_embedded', 'web']
+
+# 對沖抓取：前一個 client 超過 SUBTITLE_HEDGE_DELAY 秒仍未完成時並行啟動下一個，
+# 每部影片最多同時進行 SUBTITLE_FETCH_PARALLEL 個（設為 1 則退回逐一嘗試）
+SUBTITLE_HEDGE_DELAY = float(os.environ.get('SUBTITLE_HEDGE_DELAY', 4))
+SUBTITLE_FETCH_PARALLEL = max(1, int(os.environ.get('SUBTITLE_FETCH_PARALLEL', 2)))
+
+
+class PlayerClientStats:
+    """各 player client 的成功率與延遲統計（隨時間衰減，跨 worker 共用同一文件）
+
+    每個 client 記錄衰減後的成功／失敗次數與成功時的平均延遲，
+    order() 依成功率（高者優先）與延遲（低者優先）排序，
+    沒有統計資料時維持預設順序。
+    """
+
+    LATENCY_ALPHA = 0.3  # 延遲的指數移動平均權重
+
+    def __init__(self, path, half_life):
+        self.path = path
+        self.half_life = half_life  # 統計權重減半所需秒數
+        self._file_lock = FileLock(f'{path}.lock')
+        self._stats = {}
+        self._mtime = None
+
+    def _reload(self):
+        """文件被其他 worker 更新時重新讀取"""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._stats = json.load(f)
+            self._mtime = mtime
+        except Exception as e:
+            logger.warning(f"[字幕獲取] 載入 player client 統計失敗: {e}")
+
+    def _decayed(self, entry, now):
+        factor = 0.5 ** (max(0.0, now - entry.get('updated_at', now)) / self.half_life)
+        return entry.get('success', 0.0) * factor, entry.get('failure', 0.0) * factor
+
+    def success_rate(self, client, now=None):
+        """衰減後的成功率（以 1 次成功、1 次失敗作為先驗，無資料時為 0.5）"""
+        now = now or time.time()
+        success, failure = self._decayed(self._stats.get(client, {}), now)
+        return (success + 1) / (success + failure + 2)
+
+    def order(self, clients):
+        """返回依目前表現排序後的 client 列表"""
+        with self._file_lock:
+            self._reload()
+        now = time.time()
+        default_rank = {client: i for i, client in enumerate(clients)}
+        return sorted(clients, key=lambda client: (
+            -round(self.success_rate(client, now), 2),
+            self._stats.get(client, {}).get('latency', float('inf')),
+            default_rank[client]
+        ))
+
+    def record(self, client, success, latency):
+        """記錄一次嘗試結果並寫回文件"""
+        try:
+            with self._file_lock:
+                self._reload()
+                now = time.time()
+                entry = self._stats.get(client, {})
+                successes, failures = self._decayed(entry, now)
+                if success:
+                    successes += 1
+                    previous = entry.get('latency')
+                    entry['latency'] = latency if previous is None else (
+                        self.LATENCY_ALPHA * latency + (1 - self.LATENCY_ALPHA) * previous)
+                else:
+                    failures += 1
+                entry.update({'success': successes, 'failure': failures, 'updated_at': now})
+                self._stats[client] = entry
+                
+                tmp_path = f'{self.path}.{os.getpid()}.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self._stats, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_path, self.path)
+                self._mtime = os.path.getmtime(self.path)
+        except Exception as e:
+            logger.warning(f"[字幕獲取] 保存 player client 統計失敗: {e}")
+
+
+player_client_stats = PlayerClientStats(
+    PLAYER_CLIENT_STATS_FILE,
+    half_life=float(os.environ.get('PLAYER_CLIENT_STATS_HALF_LIFE', 24)) * 3600
+)
+
+
+# 字幕軌下載執行緒池（中文字幕與英文字幕同時下載）
+caption_downloads = ThreadPoolExecutor(
+    max_workers=max(1, int(os.environ.get('CAPTION_DOWNLOAD_WORKERS', 4))),
+    thread_name_prefix='caption-download'
+)
+
+
+class SubtitleFetchError(Exception):
+    """單一 player client 找不到英文字幕軌"""
+
+
+class SubtitleDownloadError(Exception):
+    """找到字幕軌但下載或解析失敗（訊息保留 HTTP 狀態等原始錯誤，供判斷是否被限流）"""
+
+
+def is_blocked_error(error_msg):
+    """是否為 429 或反爬蟲錯誤"""
+    return '429' in error_msg or 'bot' in error_msg.lower() or 'Sign in to confirm' in error_msg
+
+
+def is_cloud_environment():
+    """檢測是否在雲端環境（Render、Railway 等）"""
+    # Render 會設置 PORT 環境變數，且通常不會有某些本地環境變數
+    is_cloud_env = (
+        os.environ.get('RENDER') or 
+        os.environ.get('RAILWAY_ENVIRONMENT') or 
+        os.environ.get('FLY_APP_NAME') or
+        (os.environ.get('PORT') and not os.environ.get('HOME'))  # Render 設置 PORT 但沒有 HOME
+    )
     
-    import tempfile
-    import os
+    # 如果無法確定，根據主機名判斷（Render 的主機名通常包含 render.com）
+    if not is_cloud_env:
+        import socket
+        try:
+            hostname = socket.gethostname()
+            if 'render' in hostname.lower() or 'railway' in hostname.lower():
+                is_cloud_env = True
+        except:
+            pass
+    
+    return bool(is_cloud_env)
+
+
+# 中英文字幕對齊時允許的開始時間差（秒）
+SUBTITLE_ALIGN_WINDOW = 0.5
+
+
+def merge_bilingual_subtitles(en_subtitles, zh_subtitles):
+    """以英文字幕的時間軸為準，匹配中文字幕
+
+    兩邊都依開始時間排序後以雙指標掃描：候選為開始時間與英文相差不到
+    SUBTITLE_ALIGN_WINDOW 秒的中文字幕，其中時間區間重疊最多者勝出
+    （重疊相同時取開始時間最接近者），整體為線性時間。
+    """
+    zh_lines = sorted(
+        (zh_sub['start'], zh_sub['end'], zh_sub['english'])  # 中文字幕的內容在 'english' 欄位
+        for zh_sub in (zh_subtitles or [])
+    )
     
+    merged_subtitles = [{
+        'start': en_sub['start'],
+        'end': en_sub['end'],
+        'english': en_sub['english'],
+        'chinese': ''
+    } for en_sub in en_subtitles]
+    
+    if not zh_lines:
+        return merged_subtitles
+    
+    # 英文字幕通常已按時間排序，保險起見依開始時間處理（保留原順序輸出）
+    order = sorted(range(len(merged_subtitles)), key=lambda i: merged_subtitles[i]['start'])
+    lo = 0
+    for i in order:
+        merged_sub = merged_subtitles[i]
+        en_start, en_end = merged_sub['start'], merged_sub['end']
+        
+        # 窗口左界只會往右移動
+        while lo < len(zh_lines) and zh_lines[lo][0] <= en_start - SUBTITLE_ALIGN_WINDOW:
+            lo += 1
+        
+        best = None
+        best_score = None
+        j = lo
+        while j < len(zh_lines) and zh_lines[j][0] < en_start + SUBTITLE_ALIGN_WINDOW:
+            zh_start, zh_end, zh_text = zh_lines[j]
+            overlap = max(0.0, min(en_end, zh_end) - max(en_start, zh_start))
+            score = (overlap, -abs(zh_start - en_start))
+            if best_score is None or score > best_score:
+                best, best_score = zh_text, score
+            j += 1
+        
+        if best:
+            merged_sub['chinese'] = best
+    
+    return merged_subtitles
+
+
+def fetch_with_player_client(video_id, player_client, tmpdir, base_delay, retry_count, cancelled):
+    """使用指定的 player client 抓取並合併字幕
+    
+    失敗時拋出例外；cancelled 被設定（其他 client 已成功）時提前放棄，返回 None。
+    """
     url = f'https://www.youtube.com/watch?v={video_id}'
     
+    ydl_opts = {
+        'writesubtitles': True,
+        'writeautomaticsub': True,
+        'subtitleslangs': ['en', 'zh-TW', 'zh-CN', 'en-US', 'en-GB'],
+        'subtitlesformat': '/'.join(SUBTITLE_FORMAT_PREFERENCE + ['best']),
+        'skip_download': True,
+        'outtmpl': os.path.join(tmpdir, player_client, '%(id)s.%(ext)s'),
+        'quiet': False,
+        'no_warnings': False,
+        'extractor_args': {
+            'youtube': {
+                'player_client': [player_client]
+            }
+        },
+        # 添加重試機制（雲端環境使用更多重試）
+        'retries': retry_count,
+        'fragment_retries': retry_count,
+        # 添加延遲以避免觸發速率限制（雲端環境使用更長延遲）
+        'sleep_interval': base_delay,
+        'sleep_interval_requests': base_delay,
+        # 添加 User-Agent 偽裝（模擬真實瀏覽器）
+        'user_agent': 'Mozilla/5.0 (Linux; Android 10; SM-G973F) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.120 Mobile Safari/537.36',
+    }
+    
+    logger.info(f"[字幕獲取] 開始使用 yt-dlp 獲取影片資訊 ({player_client})...")
+    logger.info(f"[字幕獲取] URL: {url}")
+    
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=False)
+    
+    if cancelled.is_set():
+        logger.info(f"[字幕獲取] 其他 client 已成功，放棄 {player_client} 的結果")
+        return None
+    
+    logger.info(f"[字幕獲取] 影片資訊獲取成功 (使用 {player_client})")
+    
+    # 檢查可用的字幕
+    subtitles = info.get('subtitles', {})
+    auto_captions = info.get('automatic_captions', {})
+    
+    logger.info(f"[字幕獲取] 可用字幕語言: {list(subtitles.keys())}")
+    logger.info(f"[字幕獲取] 可用自動字幕語言: {list(auto_captions.keys())}")
+    
+    # 尋找英文字幕
+    en_subtitle_data = None
+    en_lang = None
+    for lang_code in ['en', 'en-US', 'en-GB']:
+        if lang_code in subtitles:
+            en_subtitle_data = subtitles[lang_code]
+            en_lang = lang_code
+            break
+        elif lang_code in auto_captions:
+            en_subtitle_data = auto_captions[lang_code]
+            en_lang = lang_code
+            break
+    
+    # 尋找中文字幕（優先繁體，其次簡體）
+    zh_subtitle_data = None
+    zh_lang = None
+    for lang_code in ['zh-TW', 'zh-CN', 'zh-Hant', 'zh-Hans']:
+        if lang_code in subtitles:
+            zh_subtitle_data = subtitles[lang_code]
+            zh_lang = lang_code
+            break
+        elif lang_code in auto_captions:
+            zh_subtitle_data = auto_captions[lang_code]
+            zh_lang = lang_code
+            break
+    
+    if not en_subtitle_data:
+        logger.warning(f"[字幕獲取] 找不到英文字幕 ({player_client})")
+        raise SubtitleFetchError("找不到英文字幕")
+    
+    logger.info(f"[字幕獲取] 找到英文字幕: {en_lang}")
+    if zh_subtitle_data:
+        logger.info(f"[字幕獲取] 找到中文字幕: {zh_lang}")
+    else:
+        logger.info(f"[字幕獲取] 找不到中文字幕，將只返回英文字幕")
+    
+    # 中文字幕（如果有的話）在背景下載，與英文字幕同時進行
+    zh_future = None
+    if zh_subtitle_data:
+        zh_future = caption_downloads.submit(get_subtitle_for_lang, zh_subtitle_data, zh_lang)
+    
+    # 獲取英文字幕
+    try:
+        en_subtitles = get_subtitle_for_lang(en_subtitle_data, en_lang)
+        if not en_subtitles:
+            raise SubtitleDownloadError("英文字幕內容為空")
+    except SubtitleDownloadError:
+        if zh_future:
+            zh_future.cancel()
+        raise
+    
+    if cancelled.is_set():
+        if zh_future:
+            zh_future.cancel()
+        return None
+    
+    # 中文字幕失敗時只返回英文字幕
+    zh_subtitles = None
+    if zh_future:
+        try:
+            zh_subtitles = zh_future.result()
+        except SubtitleDownloadError:
+            zh_subtitles = None
+    
+    merged_subtitles = merge_bilingual_subtitles(en_subtitles, zh_subtitles)
+    logger.info(f"[字幕獲取] 字幕合併完成，共 {len(merged_subtitles)} 條，其中 {sum(1 for s in merged_subtitles if s['chinese'])} 條有中文")
+    return merged_subtitles
+
+
+def fetch_subtitles(video_id):
+    """使用 yt-dlp 獲取英文字幕和中文字幕，成功時寫入緩存
+    
+    以對沖方式嘗試多個 player client：先啟動第一個，超過 SUBTITLE_HEDGE_DELAY
+    秒仍未完成或失敗時啟動下一個，同時最多進行 SUBTITLE_FETCH_PARALLEL 個，
+    採用最先返回可用英文字幕的結果，其餘結果忽略。遇到 429 / 反爬蟲錯誤後停止對沖，
+    延遲後逐一嘗試剩餘的 client。
+    """
+    import tempfile
+    
     # 創建臨時目錄來存放字幕文件
     with tempfile.TemporaryDirectory() as tmpdir:
-        # 嘗試多個 player client，按順序嘗試以避免反爬蟲機制
-        # 優先使用移動端 client，因為它們較少觸發反爬蟲機制
-        player_clients = ['android', 'ios', 'android_embedded', 'tv_embedded', 'web']
+        player_clients = player_client_stats.order(PLAYER_CLIENTS)
         last_error = None
-        
-        # 檢測是否在雲端環境（Render、Railway 等）
-        # Render 會設置 PORT 環境變數，且通常不會有某些本地環境變數
-        is_cloud_env = (
-            os.environ.get('RENDER') or 
-            os.environ.get('RAILWAY_ENVIRONMENT') or 
-            os.environ.get('FLY_APP_NAME') or
-            (os.environ.get('PORT') and not os.environ.get('HOME'))  # Render 設置 PORT 但沒有 HOME
-        )
-        
-        # 如果無法確定，根據主機名判斷（Render 的主機名通常包含 render.com）
-        if not is_cloud_env:
-            import socket
-            try:
-                hostname = socket.gethostname()
-                if 'render' in hostname.lower() or 'railway' in hostname.lower():
-                    is_cloud_env = True
-            except:
-                pass
+        errors = []
+        is_cloud_env = is_cloud_environment()
         
         if is_cloud_env:
             logger.info("[字幕獲取] 檢測到雲端環境，將使用更保守的策略")
@@ -294,184 +1522,97 @@ def get_subtitles(video_id):
             retry_count = 3
         
         logger.info(f"[字幕獲取] 將嘗試 {len(player_clients)} 個 player client: {', '.join(player_clients)}")
-        logger.info(f"[字幕獲取] 環境設定: base_delay={base_delay}秒, retry_count={retry_count}")
+        logger.info(f"[字幕獲取] 環境設定: base_delay={base_delay}秒, retry_count={retry_count}, "
+                    f"hedge_delay={SUBTITLE_HEDGE_DELAY}秒, parallel={SUBTITLE_FETCH_PARALLEL}")
         
-        for client_index, player_client in enumerate(player_clients):
-            try:
-                logger.info(f"[字幕獲取] ========== 嘗試 {client_index + 1}/{len(player_clients)}: {player_client} ==========")
-                
-                # 在嘗試前添加隨機延遲（避免被識別為機器人）
-                if client_index > 0:
-                    delay = base_delay + random.uniform(0, 2)
-                    logger.info(f"[字幕獲取] 等待 {delay:.2f} 秒後嘗試下一個 client...")
-                    time.sleep(delay)
-                
-                ydl_opts = {
-                    'writesubtitles': True,
-                    'writeautomaticsub': True,
-                    'subtitleslangs': ['en', 'zh-TW', 'zh-CN', 'en-US', 'en-GB'],
-                    'subtitlesformat': 'srt',
-                    'skip_download': True,
-                    'outtmpl': os.path.join(tmpdir, '%(id)s.%(ext)s'),
-                    'quiet': False,
-                    'no_warnings': False,
-                    'extractor_args': {
-                        'youtube': {
-                            'player_client': [player_client]
-                        }
-                    },
-                    # 添加重試機制（雲端環境使用更多重試）
-                    'retries': retry_count,
-                    'fragment_retries': retry_count,
-                    # 添加延遲以避免觸發速率限制（雲端環境使用更長延遲）
-                    'sleep_interval': base_delay,
-                    'sleep_interval_requests': base_delay,
-                    # 添加 User-Agent 偽裝（模擬真實瀏覽器）
-                    'user_agent': 'Mozilla/5.0 (Linux; Android 10; SM-G973F) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.120 Mobile Safari/537.36',
-                }
-                
-                logger.info(f"[字幕獲取] 開始使用 yt-dlp 獲取影片資訊...")
-                logger.info(f"[字幕獲取] URL: {url}")
-                
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    info = ydl.extract_info(url, download=False)
-                
-                logger.info(f"[字幕獲取] 影片資訊獲取成功 (使用 {player_client})")
-                
-                # 檢查可用的字幕
-                subtitles = info.get('subtitles', {})
-                auto_captions = info.get('automatic_captions', {})
-                
-                logger.info(f"[字幕獲取] 可用字幕語言: {list(subtitles.keys())}")
-                logger.info(f"[字幕獲取] 可用自動字幕語言: {list(auto_captions.keys())}")
-                
-                # 尋找英文字幕
-                en_subtitle_data = None
-                en_lang = None
-                for lang_code in ['en', 'en-US', 'en-GB']:
-                    if lang_code in subtitles:
-                        en_subtitle_data = subtitles[lang_code]
-                        en_lang = lang_code
-                        break
-                    elif lang_code in auto_captions:
-                        en_subtitle_data = auto_captions[lang_code]
-                        en_lang = lang_code
-                        break
-                
-                # 尋找中文字幕（優先繁體，其次簡體）
-                zh_subtitle_data = None
-                zh_lang = None
-                for lang_code in ['zh-TW', 'zh-CN', 'zh-Hant', 'zh-Hans']:
-                    if lang_code in subtitles:
-                        zh_subtitle_data = subtitles[lang_code]
-                        zh_lang = lang_code
-                        break
-                    elif lang_code in auto_captions:
-                        zh_subtitle_data = auto_captions[lang_code]
-                        zh_lang = lang_code
-                        break
-                
-                if not en_subtitle_data:
-                    logger.warning("[字幕獲取] 找不到英文字幕")
-                    # 繼續嘗試下一個 client
-                    last_error = "找不到英文字幕"
+        cancelled = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=SUBTITLE_FETCH_PARALLEL,
+                                      thread_name_prefix=f'subtitle-{video_id}')
+        pending = {}
+        next_client = 0
+        next_launch_at = time.time()
+        blocked = False  # 遇到反爬蟲錯誤後停止對沖，改為逐一嘗試
+        
+        try:
+            while pending or next_client < len(player_clients):
+                now = time.time()
+                # 對沖：到了啟動時間且未達並行上限時啟動下一個 client
+                parallel = 1 if blocked else SUBTITLE_FETCH_PARALLEL
+                if (next_client < len(player_clients) and len(pending) < parallel
+                        and now >= next_launch_at):
+                    player_client = player_clients[next_client]
+                    next_client += 1
+                    logger.info(f"[字幕獲取] ========== 嘗試 {next_client}/{len(player_clients)}: {player_client} ==========")
+                    future = executor.submit(fetch_with_player_client, video_id, player_client,
+                                             tmpdir, base_delay, retry_count, cancelled)
+                    pending[future] = (player_client, now)
+                    next_launch_at = now + SUBTITLE_HEDGE_DELAY
                     continue
                 
-                logger.info(f"[字幕獲取] 找到英文字幕: {en_lang}")
-                if zh_subtitle_data:
-                    logger.info(f"[字幕獲取] 找到中文字幕: {zh_lang}")
-                else:
-                    logger.info(f"[字幕獲取] 找不到中文字幕，將只返回英文字幕")
-                
-                # 獲取英文字幕
-                en_subtitles = get_subtitle_for_lang(en_subtitle_data, en_lang)
-                if not en_subtitles:
-                    last_error = "無法獲取英文字幕內容"
+                timeout = None
+                if next_client < len(player_clients) and len(pending) < parallel:
+                    timeout = max(0.0, next_launch_at - now)
+                if not pending:
+                    # 沒有進行中的 client（退避等待中）：wait() 對空集合會立即返回
+                    time.sleep(timeout)
                     continue
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
                 
-                # 獲取中文字幕（如果有的話）
-                zh_subtitles = None
-                if zh_subtitle_data:
-                    zh_subtitles = get_subtitle_for_lang(zh_subtitle_data, zh_lang)
-                
-                # 合併字幕（以英文字幕的時間軸為準，匹配中文字幕）
-                merged_subtitles = []
-                zh_dict = {}
-                
-                # 建立中文字幕的時間索引
-                if zh_subtitles:
-                    for zh_sub in zh_subtitles:
-                        # 使用開始時間作為鍵
-                        key = round(zh_sub['start'], 2)
-                        zh_dict[key] = zh_sub['english']  # 中文字幕的內容在 'english' 欄位
-                
-                # 合併字幕
-                for en_sub in en_subtitles:
-                    merged_sub = {
-                        'start': en_sub['start'],
-                        'end': en_sub['end'],
-                        'english': en_sub['english']
-                    }
-                    
-                    # 嘗試匹配中文字幕（允許 0.5 秒的時間差）
-                    en_start = round(en_sub['start'], 2)
-                    matched_zh = None
-                    for key in zh_dict:
-                        if abs(key - en_start) < 0.5:
-                            matched_zh = zh_dict[key]
-                            break
-                    
-                    merged_sub['chinese'] = matched_zh if matched_zh else ''
-                    merged_subtitles.append(merged_sub)
-                
-                logger.info(f"[字幕獲取] 字幕合併完成，共 {len(merged_subtitles)} 條，其中 {sum(1 for s in merged_subtitles if s['chinese'])} 條有中文")
-                
-                # 保存到緩存
-                subtitle_cache = load_subtitle_cache()
-                subtitle_cache[video_id] = {
-                    'subtitles': merged_subtitles,
-                    'cached_at': datetime.now().isoformat()
-                }
-                save_subtitle_cache(subtitle_cache)
-                logger.info(f"[字幕緩存] 已保存字幕到緩存，video_id: {video_id}")
-                
-                return merged_subtitles
+                for future in done:
+                    player_client, started_at = pending.pop(future)
+                    try:
+                        merged_subtitles = future.result()
+                    except Exception as e:
+                        error_msg = str(e)
+                        last_error = error_msg
+                        errors.append(e)
+                        player_client_stats.record(player_client, False, time.time() - started_at)
+                        logger.warning(f"[字幕獲取] 使用 {player_client} 失敗: {error_msg}")
+                        
+                        # 反爬蟲錯誤：延後下一次啟動並停止對沖，之後逐一嘗試，避免被識別為機器人
+                        if is_blocked_error(error_msg):
+                            delay = base_delay * 2 + (2 if is_cloud_env else 0) + random.uniform(0, 2)
+                            logger.info(f"[字幕獲取] 檢測到反爬蟲機制，等待 {delay:.2f} 秒後嘗試下一個 player client")
+                            blocked = True
+                            next_launch_at = max(next_launch_at, time.time() + delay)
+                        elif blocked:
+                            # 已被限流時其他錯誤也不提前啟動
+                            delay = base_delay + random.uniform(0, 1)
+                            next_launch_at = max(next_launch_at, time.time() + delay)
+                        else:
+                            # 失敗後不必等滿對沖延遲，稍作隨機延遲即嘗試下一個 client
+                            delay = random.uniform(0, base_delay)
+                            next_launch_at = min(next_launch_at, time.time() + delay)
+                        continue
                     
-            except Exception as e:
-                error_msg = str(e)
-                last_error = error_msg
-                logger.warning(f"[字幕獲取] 使用 {player_client} 失敗: {error_msg}")
-                
-                # 如果是 429 錯誤或反爬蟲錯誤，繼續嘗試下一個 client
-                if '429' in error_msg or 'bot' in error_msg.lower() or 'Sign in to confirm' in error_msg:
-                    logger.info(f"[字幕獲取] 檢測到反爬蟲機制，將嘗試下一個 player client")
-                    # 在嘗試下一個 client 前稍作延遲（雲端環境使用更長延遲）
-                    if client_index < len(player_clients) - 1:
-                        delay = base_delay * 2 + (2 if is_cloud_env else 0)
-                        delay += random.uniform(0, 2)  # 添加隨機延遲
-                        logger.info(f"[字幕獲取] 等待 {delay:.2f} 秒後嘗試下一個 client...")
-                        time.sleep(delay)
-                    continue
-                else:
-                    # 其他錯誤也繼續嘗試
-                    if client_index < len(player_clients) - 1:
-                        delay = base_delay + (1 if is_cloud_env else 0)
-                        delay += random.uniform(0, 1)
-                        time.sleep(delay)
-                    continue
+                    if merged_subtitles:
+                        cancelled.set()
+                        player_client_stats.record(player_client, True, time.time() - started_at)
+                        logger.info(f"[字幕獲取] 採用 {player_client} 的結果，忽略其餘 {len(pending)} 個進行中的 client")
+                        
+                        # 保存到緩存
+                        subtitle_cache.put(video_id, merged_subtitles)
+                        logger.info(f"[字幕緩存] 已保存字幕到緩存，video_id: {video_id}")
+                        return merged_subtitles
+        finally:
+            cancelled.set()
+            executor.shutdown(wait=False, cancel_futures=True)
         
-        # 所有 client 都失敗了
+        # 所有 client 都失敗了：記錄到負面緩存，到期前不再重新抓取
         logger.error(f"[字幕獲取] 所有 player client 都失敗，最後錯誤: {last_error}")
+        if any(is_blocked_error(str(e)) for e in errors):
+            kind = SubtitleFailureCache.BLOCKED
+        # 只有所有 client 都找不到英文字幕軌才視為沒有字幕；下載失敗屬於暫時性錯誤
+        elif errors and all(isinstance(e, SubtitleFetchError) for e in errors):
+            kind = SubtitleFailureCache.NO_CAPTIONS
+        else:
+            kind = SubtitleFailureCache.ERROR
+        subtitle_failures.put(video_id, kind, last_error)
         return None
 
 
-def convert_json_to_srt(json_data):
-    """將 YouTube JSON 格式字幕轉換為 SRT 格式"""
-    import json
-    
-    srt_lines = []
-    index = 1
-    
+def iter_json3_cues(json_data):
+    """將 YouTube json3 字幕直接轉為字幕（tStartMs / dDurationMs 為整數毫秒）"""
     # YouTube JSON 格式：{"events": [{"segs": [{"utf8": "text"}], "tStartMs": 1000, "dDurationMs": 2000}, ...]}
     if isinstance(json_data, dict) and 'events' in json_data:
         events = json_data['events']
@@ -479,177 +1620,145 @@ def convert_json_to_srt(json_data):
         events = json_data
     else:
         logger.warning(f"[字幕轉換] 未知的 JSON 格式")
-        return ""
+        return
     
     for event in events:
-        if 'segs' not in event or 'tStartMs' not in event:
-            continue
-        
-        # 提取文字
-        text_parts = []
-        for seg in event.get('segs', []):
-            if 'utf8' in seg:
-                text_parts.append(seg['utf8'])
-        
-        if not text_parts:
+        segs = event.get('segs')
+        if not segs or 'tStartMs' not in event:
             continue
         
-        text = ' '.join(text_parts).strip()
+        # 各片段自帶前置空白，直接相接後再正規化空白與換行
+        text = ' '.join(''.join(seg.get('utf8', '') for seg in segs).split())
         if not text:
             continue
         
-        # 時間轉換（毫秒轉秒）
-        start_ms = event['tStartMs']
-        duration_ms = event.get('dDurationMs', 0)
-        end_ms = start_ms + duration_ms
-        
-        start_sec = start_ms / 1000.0
-        end_sec = end_ms / 1000.0
-        
-        # 轉換為 SRT 時間格式
-        start_h = int(start_sec // 3600)
-        start_m = int((start_sec % 3600) // 60)
-        start_s = int(start_sec % 60)
-        start_ms_remainder = int((start_sec % 1) * 1000)
-        
-        end_h = int(end_sec // 3600)
-        end_m = int((end_sec % 3600) // 60)
-        end_s = int(end_sec % 60)
-        end_ms_remainder = int((end_sec % 1) * 1000)
-        
-        time_str = f"{start_h:02d}:{start_m:02d}:{start_s:02d},{start_ms_remainder:03d} --> {end_h:02d}:{end_m:02d}:{end_s:02d},{end_ms_remainder:03d}"
-        
-        srt_lines.append(f"{index}\n{time_str}\n{text}\n")
-        index += 1
-    
-    return '\n'.join(srt_lines)
+        start_ms = int(event['tStartMs'])
+        end_ms = start_ms + int(event.get('dDurationMs', 0))
+        yield {
+            'start': start_ms / 1000.0,
+            'end': end_ms / 1000.0,
+            'english': text
+        }
 
 
-def parse_subtitle_content(content):
-    """解析字幕內容（SRT / VTT 格式），並按句子合併"""
-    raw_subtitles = []
+# 字幕時間戳：H:MM:SS.mmm / MM:SS.mmm，毫秒以逗號（SRT）或句點（VTT）分隔
+TIMESTAMP_PATTERN = re.compile(r'(?:(\d+):)?(\d+):(\d+)[,.](\d+)')
 
-    if not content:
-        return []
+# SRT 序號行
+CUE_INDEX_PATTERN = re.compile(r'\d+')
 
-    # 以空行分段（同時支援 SRT 及 VTT）
-    blocks = re.split(r'\n\s*\n', content.strip())
 
-    def _parse_timestamp(ts: str):
-        """解析單一時間戳，支援 H:MM:SS.mmm / MM:SS.mmm / 逗號或句點"""
-        ts = ts.strip()
-        if not ts:
-            return None
+def parse_timestamp(ts):
+    """解析單一時間戳（秒），無法解析時返回 None"""
+    match = TIMESTAMP_PATTERN.match(ts.strip())
+    if not match:
+        return None
+    h, m, s, ms = match.groups()
+    return int(h or 0) * 3600 + int(m) * 60 + int(s) + int(ms[:3].ljust(3, '0')) / 1000.0
 
-        # 拆出毫秒
-        if ',' in ts:
-            main, ms = ts.split(',', 1)
-        elif '.' in ts:
-            main, ms = ts.split('.', 1)
-        else:
-            return None
 
-        parts = main.split(':')
-        if len(parts) == 3:
-            h, m, s = parts
-        elif len(parts) == 2:
-            h, m, s = '0', parts[0], parts[1]
-        else:
-            return None
+def parse_timecode(line):
+    """解析時間軸行（start --> end），無法解析時返回 (None, None)"""
+    if '-->' not in line:
+        return None, None
+    left, right = line.split('-->', 1)
+    return parse_timestamp(left), parse_timestamp(right)
 
-        try:
-            h = int(h)
-            m = int(m)
-            s = int(s)
-            ms_digits = re.sub(r'\D', '', ms)[:3]
-            ms_val = int(ms_digits.ljust(3, '0')) if ms_digits else 0
-        except ValueError:
-            return None
 
-        return h * 3600 + m * 60 + s + ms_val / 1000.0
+def _parse_cue_block(lines):
+    """解析一個字幕區塊（已去除空白的非空行），返回字幕或 None"""
+    # 跳過 WebVTT 標頭
+    if lines[0].upper().startswith('WEBVTT'):
+        return None
 
-    def parse_timecode(line: str):
-        if '-->' not in line:
-            return None, None
-        left, right = line.split('-->', 1)
-        start = _parse_timestamp(left)
-        end = _parse_timestamp(right)
-        return start, end
+    # 1) SRT：第一行是序號，第二行是時間軸
+    if CUE_INDEX_PATTERN.fullmatch(lines[0]) and len(lines) >= 2:
+        start_time, end_time = parse_timecode(lines[1])
+        text_lines = lines[2:]
+    # 2) VTT：第一行直接是時間軸
+    else:
+        start_time, end_time = parse_timecode(lines[0])
+        text_lines = lines[1:]
 
-    for block in blocks:
-        # 拆成行並去除前後空白
-        lines = [line.strip() for line in block.splitlines() if line.strip()]
-        if not lines:
-            continue
+    if start_time is None or end_time is None:
+        return None
+
+    text = ' '.join(text_lines).strip()
+    if not text:
+        return None
+    return {
+        'start': start_time,
+        'end': end_time,
+        'english': text
+    }
 
-        # 跳過 WebVTT 標頭
-        if lines[0].upper().startswith('WEBVTT'):
-            continue
 
+def iter_subtitle_cues(lines):
+    """逐行解析 SRT / VTT 字幕並逐條產生字幕
+
+    lines 可以是任何逐行迭代的來源（文件物件、HTTP 回應的 raw 串流、字串列表），
+    bytes 以 UTF-8 解碼。只保留當前區塊的行，長時間直播字幕的記憶體用量也維持固定。
+    """
+    block = []
+    first = True
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if first:
+            line = line.lstrip('\ufeff')
+            first = False
+        line = line.strip()
+        if line:
+            block.append(line)
+            continue
+        # 空行結束一個區塊
+        if block:
+            try:
+                cue = _parse_cue_block(block)
+            except Exception as e:
+                logger.warning(f"Error parsing subtitle block: {e}")
+                cue = None
+            if cue:
+                yield cue
+            block = []
+    if block:
         try:
-            time_line = None
-            text_lines = []
-            start_time = None
-            end_time = None
-
-            # 1) SRT：第一行是序號，第二行是時間軸
-            if re.fullmatch(r'\d+', lines[0]) and len(lines) >= 2:
-                time_line = lines[1]
-                text_lines = lines[2:]
-                start_time, end_time = parse_timecode(time_line)
-            # 2) VTT：第一行直接是時間軸
-            else:
-                start_time, end_time = parse_timecode(lines[0])
-                if start_time is not None:
-                    time_line = lines[0]
-                    text_lines = lines[1:]
+            cue = _parse_cue_block(block)
+        except Exception as e:
+            logger.warning(f"Error parsing subtitle block: {e}")
+            cue = None
+        if cue:
+            yield cue
 
-            if time_line is None:
-                time_line = lines[0]
-                text_lines = lines[1:]
-                start_time, end_time = parse_timecode(time_line)
 
-            if start_time is None or end_time is None:
-                continue
+# 單字（字母、連字號、撇號）
+WORD_PATTERN = re.compile(r"[a-zA-Z]+(?:[-'][a-zA-Z]+)*")
 
-            text = ' '.join(text_lines).strip()
+# 句尾標點（. ! ?），可能在引號後面，連同其後的空白
+SENTENCE_END_PATTERN = re.compile(r'[.!?]["\']?\s*')
 
-            if text:
-                raw_subtitles.append({
-                    'start': start_time,
-                    'end': end_time,
-                    'english': text
-                })
-        except Exception as e:
-            logger.warning(f"Error parsing subtitle block: {e}")
-            continue
-    
-    # 按句子合併字幕
-    return merge_subtitles_by_sentence(raw_subtitles)
+# 沒有句點時，每句最多的單字數
+MAX_WORDS_PER_SENTENCE = 15
 
 
 def count_words(text):
     """計算文字中的單字數量"""
     if not text:
         return 0
-    # 匹配單字（字母、連字號、撇號）
-    words = re.findall(r"[a-zA-Z]+(?:[-'][a-zA-Z]+)*", text)
-    return len(words)
+    return sum(1 for _ in WORD_PATTERN.finditer(text))
 
 
-def merge_subtitles_by_sentence(raw_subtitles):
-    """將字幕按句子合併（優先以句點斷句，否則不超過15個單字）"""
-    if not raw_subtitles:
-        return []
-    
-    merged = []
-    current_sentence = {
-        'text_parts': [],
-        'start': None,
-        'end': None
-    }
-    
-    MAX_WORDS_PER_SENTENCE = 15
+def segment_sentences(raw_subtitles):
+    """逐條接收字幕並產生合併後的句子（優先以句點斷句，否則不超過15個單字）
+
+    生成器版本：每條字幕只掃描新加入的文字並累計單字數。
+    緩衝區在斷句後不會留下句尾標點，因此新的斷句點只可能出現在新加入的文字中；
+    單字不會跨越以空白連接的片段，單字數可以逐段累加。
+    """
+    parts = []       # 當前句子的文字片段
+    start = None
+    end = None
+    word_count = 0
     
     for sub in raw_subtitles:
         text = sub['english'].strip()
@@ -657,95 +1766,423 @@ def merge_subtitles_by_sentence(raw_subtitles):
             continue
         
         # 初始化當前句子的開始時間
-        if current_sentence['start'] is None:
-            current_sentence['start'] = sub['start']
+        if start is None:
+            start = sub['start']
         
         # 添加文字到當前句子
-        current_sentence['text_parts'].append(text)
-        current_sentence['end'] = sub['end']
+        parts.append(text)
+        end = sub['end']
         
-        # 合併當前累積的文字
-        current_text = ' '.join(current_sentence['text_parts']).strip()
+        # 優先檢查新文字中是否有句點（. ! ?），在最後一個句點處斷句
+        last_match = None
+        for last_match in SENTENCE_END_PATTERN.finditer(text):
+            pass
         
-        # 優先檢查是否有句點（. ! ?），在句點處斷句
-        # 使用正則表達式找到最後一個句點位置（考慮引號後面的標點）
-        # 匹配句點、問號、驚嘆號，可能在引號後面
-        sentence_end_pattern = r'[.!?]["\']?\s*'
-        matches = list(re.finditer(sentence_end_pattern, current_text))
-        
-        if matches:
-            # 找到最後一個句點位置
-            last_match = matches[-1]
-            end_pos = last_match.end()
-            
+        if last_match is not None:
             # 在句點處分割
-            sentence_text = current_text[:end_pos].strip()
-            remaining_text = current_text[end_pos:].strip()
+            end_pos = last_match.end()
+            parts[-1] = text[:end_pos]
+            sentence_text = ' '.join(parts).strip()
+            remaining_text = text[end_pos:].strip()
             
-            # 保存完整的句子
+            # 輸出完整的句子
             if sentence_text:
-                merged.append({
-                    'start': current_sentence['start'],
-                    'end': current_sentence['end'],
+                yield {
+                    'start': start,
+                    'end': end,
                     'english': sentence_text
-                })
+                }
             
-            # 如果有剩餘文字，開始新句子
+            # 如果有剩餘文字，開始新句子；否則重置當前句子
             if remaining_text:
-                current_sentence = {
-                    'text_parts': [remaining_text],
-                    'start': sub['start'],
-                    'end': sub['end']
-                }
+                parts = [remaining_text]
+                start = sub['start']
+                word_count = count_words(remaining_text)
             else:
-                # 重置當前句子
-                current_sentence = {
-                    'text_parts': [],
-                    'start': None,
-                    'end': None
-                }
+                parts = []
+                start = None
+                end = None
+                word_count = 0
             continue
         
         # 如果沒有句點，檢查是否超過15個單字
-        word_count = count_words(current_text)
+        added_words = count_words(text)
+        word_count += added_words
         
-        # 如果超過15個單字，先保存當前句子
         if word_count > MAX_WORDS_PER_SENTENCE:
             # 移除最後添加的文字（因為它會讓句子超過15個單字）
-            last_text = current_sentence['text_parts'].pop()
-            last_end = current_sentence['end']
+            last_text = parts.pop()
             
-            sentence_text = ' '.join(current_sentence['text_parts']).strip()
+            sentence_text = ' '.join(parts).strip()
             if sentence_text:
-                merged.append({
-                    'start': current_sentence['start'],
+                yield {
+                    'start': start,
                     'end': sub['start'],  # 使用下一個字幕的開始時間作為結束時間
                     'english': sentence_text
-                })
+                }
             
             # 開始新句子（使用剛才移除的文字）
-            current_sentence = {
-                'text_parts': [last_text],
-                'start': sub['start'],
-                'end': last_end
+            parts = [last_text]
+            start = sub['start']
+            word_count = added_words
+    
+    # 處理最後一個未完成的句子
+    if parts:
+        sentence_text = ' '.join(parts).strip()
+        if sentence_text:
+            yield {
+                'start': start,
+                'end': end,
+                'english': sentence_text
+            }
+
+
+# 批次翻譯時每次請求的字元上限（Google 翻譯單次上限為 5000 字元；設為 0 則逐條翻譯）
+TRANSLATION_BATCH_CHARS = int(os.environ.get('TRANSLATION_BATCH_CHARS', 4500))
+
+# 每個批次最多包含的字幕條數（批次越小，依播放位置排序的粒度越細）
+TRANSLATION_BATCH_MAX_LINES = max(1, int(os.environ.get('TRANSLATION_BATCH_MAX_LINES', 40)))
+
+# 每個翻譯任務同時進行的翻譯請求數
+TRANSLATION_WORKERS = max(1, int(os.environ.get('TRANSLATION_WORKERS', 4)))
+
+# 翻譯請求的速率限制（每秒請求數，0 表示不限制）與可累積的突發請求數
+TRANSLATION_RATE_LIMIT = float(os.environ.get('TRANSLATION_RATE_LIMIT', 5))
+TRANSLATION_RATE_BURST = float(os.environ.get('TRANSLATION_RATE_BURST', 10))
+
+
+class TokenBucket:
+    """令牌桶限速器：每秒補充 rate 個令牌，最多累積 capacity 個"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def available(self):
+        """目前可用的令牌數（不消耗令牌；不限速時為無限大）"""
+        if self.rate <= 0:
+            return float('inf')
+        with self._lock:
+            return min(self.capacity, self._tokens + (time.monotonic() - self._updated) * self.rate)
+
+    def acquire(self, tokens=1):
+        """取得令牌，不足時阻塞等待"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# 全進程共用的翻譯限速器（所有翻譯任務的請求都經過它，避免被 Google 限流）
+translation_rate_limiter = TokenBucket(TRANSLATION_RATE_LIMIT, TRANSLATION_RATE_BURST)
+
+
+def plan_translation_batches(texts, max_chars=None, max_lines=None):
+    """將文字依字元預算分組，每組以換行符合併後不超過 max_chars、且不超過 max_lines 條"""
+    if max_chars is None:
+        max_chars = TRANSLATION_BATCH_CHARS
+    if max_lines is None:
+        max_lines = TRANSLATION_BATCH_MAX_LINES
+    batches = []
+    batch = []
+    size = 0
+    for text in texts:
+        cost = len(text) + 1  # 加上分隔用的換行符
+        if batch and (max_chars <= 0 or size + cost > max_chars or len(batch) >= max_lines):
+            batches.append(batch)
+            batch = []
+            size = 0
+        batch.append(text)
+        size += cost
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def translate_batch(translator, texts):
+    """以換行符合併多條文字一次翻譯，返回與 texts 一一對應的譯文（失敗的條目為 None）
+
+    只有譯文的行數與原文不符時，才將批次對半拆分後重試，直到單條翻譯為止；
+    請求本身失敗（限流、網路錯誤）時整批記為失敗，避免在被限流時成倍增加請求。
+    """
+    if len(texts) == 1:
+        try:
+            translation_rate_limiter.acquire()
+            return [translator.translate(texts[0])]
+        except Exception as e:
+            logger.warning(f"[翻譯] 翻譯錯誤: {e}")
+            return [None]
+
+    try:
+        translation_rate_limiter.acquire()
+        result = translator.translate('\n'.join(text.replace('\n', ' ') for text in texts))
+    except Exception as e:
+        logger.warning(f"[翻譯] 批次翻譯錯誤（{len(texts)} 條）: {e}")
+        return [None] * len(texts)
+
+    parts = result.split('\n') if result else []
+    if len(parts) == len(texts):
+        return [part.strip() for part in parts]
+    logger.warning(f"[翻譯] 批次譯文行數不符（{len(parts)}/{len(texts)}），拆分後重試")
+
+    mid = len(texts) // 2
+    return translate_batch(translator, texts[:mid]) + translate_batch(translator, texts[mid:])
+
+
+def translate_texts(texts):
+    """翻譯一組零散文字，返回 {原文: 譯文}（失敗的條目為 None）
+
+    先查翻譯快取，其餘去重後合併為盡量少的批次，多個批次時並行送出。
+    """
+    results = {}
+    missing = []
+    for text in texts:
+        if text in results or text in missing:
+            continue
+        if text in translation_cache:
+            results[text] = translation_cache[text]
+        else:
+            missing.append(text)
+    if not missing:
+        return results
+
+    def run(batch):
+        # GoogleTranslator 不是執行緒安全的，每個批次使用自己的實例
+        return translate_batch(GoogleTranslator(source='en', target='zh-TW'), batch)
+
+    batches = plan_translation_batches(missing)
+    if len(batches) == 1:
+        batch_results = [run(batches[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=min(TRANSLATION_WORKERS, len(batches))) as executor:
+            batch_results = list(executor.map(run, batches))
+
+    for batch, translations in zip(batches, batch_results):
+        for text, result in zip(batch, translations):
+            results[text] = result
+            if result is not None:
+                translation_store.record(text, result)
+    return results
+
+
+class ProgressStore:
+    """翻譯進度存放區：只記錄已完成字幕在任務字幕陣列中的索引，
+    完成的任務在寬限期後移除，長時間未更新或超過數量上限的項目也會被清除"""
+
+    def __init__(self, ttl, grace, max_entries):
+        self.ttl = ttl                  # 未完成任務多久沒更新視為失效（秒）
+        self.grace = grace              # 完成後保留多久供前端讀取（秒）
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._entries = OrderedDict()
+
+    def _purge(self, now):
+        expired = [
+            key for key, entry in self._entries.items()
+            if (entry['completed'] and now - entry['finished_at'] > self.grace)
+            or (not entry['completed'] and now - entry['updated_at'] > self.ttl)
+        ]
+        for key in expired:
+            del self._entries[key]
+        # 超過數量上限時，優先移除最舊的已完成任務，其次是最舊的任務
+        while len(self._entries) > self.max_entries:
+            key = next((k for k, e in self._entries.items() if e['completed']), None)
+            if key is None:
+                key = next(iter(self._entries))
+            del self._entries[key]
+
+    def create(self, key, total):
+        now = time.time()
+        with self._lock:
+            self._entries[key] = {
+                'current': 0,
+                'total': total,
+                'translated': 0,
+                'cached': 0,
+                'elapsed': 0,
+                'completed': False,
+                'items': None,      # 任務的字幕陣列（翻譯結果直接寫入）
+                'indices': [],      # 依完成順序記錄的字幕索引
+                'updated_at': now,
+                'finished_at': None
             }
-    
-    # 處理最後一個未完成的句子
-    if current_sentence['text_parts']:
-        sentence_text = ' '.join(current_sentence['text_parts']).strip()
-        if sentence_text:
-            merged.append({
-                'start': current_sentence['start'],
-                'end': current_sentence['end'],
-                'english': sentence_text
-            })
-    
-    logger.info(f"[字幕處理] 原始字幕: {len(raw_subtitles)} 條，合併後: {len(merged)} 條句子")
-    return merged
+            self._purge(now)
+
+    def attach(self, key, items):
+        """綁定任務的字幕陣列（不存在時建立進度項目）"""
+        if key not in self:
+            self.create(key, len(items))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry['items'] = items
+                entry['total'] = len(items)
+
+    def record(self, key, index, **stats):
+        """記錄一條已完成的字幕並更新統計"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.update(stats)
+            entry['indices'].append(index)
+            entry['updated_at'] = time.time()
+            self._changed.notify_all()
+
+    def complete(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry['completed'] = True
+                entry['updated_at'] = now
+                entry['finished_at'] = now
+                self._changed.notify_all()
+
+    def is_completed(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return bool(entry and entry['completed'])
+
+    def wait(self, key, last_index, timeout):
+        """等待 last_index 之後有新完成的字幕或任務完成，最多等待 timeout 秒
+        
+        返回 snapshot()，超時且沒有變化時 new_items 為空
+        """
+        deadline = time.time() + timeout
+        with self._changed:
+            while True:
+                entry = self._entries.get(key)
+                if entry is None or entry['completed'] or len(entry['indices']) > last_index:
+                    break
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+            return self._snapshot(key, last_index)
+
+    def snapshot(self, key, last_index=0):
+        """返回進度與 last_index 之後新完成的字幕（找不到時返回 None）"""
+        with self._lock:
+            return self._snapshot(key, last_index)
+
+    def _snapshot(self, key, last_index):
+        self._purge(time.time())
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        indices = entry['indices']
+        items = entry['items'] or []
+        new_indices = indices[max(0, last_index):]
+        return {
+            'current': entry['current'],
+            'total': entry['total'],
+            'translated': entry['translated'],
+            'cached': entry['cached'],
+            'elapsed': entry['elapsed'],
+            'completed': entry['completed'],
+            'new_items': [{
+                'index': i,
+                'start': items[i]['start'],
+                'end': items[i]['end'],
+                'english': items[i]['english'],
+                'chinese': items[i].get('chinese', '')
+            } for i in new_indices],
+            'last_index': len(indices)
+        }
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._entries.pop(key, default)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
 
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
 
-def translate_subtitles(subtitles, progress_key=None, update_callback=None):
-    """翻譯字幕為中文，支持進度追蹤和實時更新"""
+
+# SSE 進度推送：單次連線最長秒數、保活間隔、瀏覽器重連等待（毫秒）
+PROGRESS_STREAM_SECONDS = float(os.environ.get('TRANSLATION_PROGRESS_STREAM_SECONDS', 60))
+PROGRESS_STREAM_KEEPALIVE = 15
+PROGRESS_STREAM_RETRY_MS = 1000
+
+# 翻譯進度追蹤（用於多個請求）
+translation_progress = ProgressStore(
+    ttl=float(os.environ.get('TRANSLATION_PROGRESS_TTL', 3600)),
+    grace=float(os.environ.get('TRANSLATION_PROGRESS_GRACE', 600)),
+    max_entries=int(os.environ.get('TRANSLATION_PROGRESS_MAX', 200))
+)
+
+
+class PlayheadScheduler:
+    """翻譯批次的優先佇列：依批次與目前播放位置的距離排序，即將播放的字幕最先翻譯"""
+
+    # 已播過的字幕距離加權（同樣距離時，播放位置之後的字幕優先）
+    BEHIND_WEIGHT = 3
+
+    def __init__(self, batch_times, playhead=0.0):
+        # 每個批次所含字幕的開始時間與對應的結束時間（依開始時間排序）。
+        # 重複出現的文字會讓批次的字幕散布在整部影片，因此以最近的一條字幕計算距離，而非 (最早, 最晚) 範圍
+        self._starts = [[start for start, _ in times] for times in batch_times]
+        self._ends = [[end for _, end in times] for times in batch_times]
+        self._lock = threading.Lock()
+        self._playhead = playhead
+        self._heap = [(self._distance(n), n) for n in range(len(batch_times))]
+        heapq.heapify(self._heap)
+
+    def _distance(self, n):
+        starts, ends = self._starts[n], self._ends[n]
+        if not starts:
+            return 0.0
+        k = bisect.bisect_right(starts, self._playhead)
+        ahead = starts[k] - self._playhead if k < len(starts) else float('inf')
+        if k == 0:
+            return ahead
+        # 播放位置之前最近開始的字幕
+        if self._playhead <= ends[k - 1]:
+            return 0.0
+        return min(ahead, (self._playhead - ends[k - 1]) * self.BEHIND_WEIGHT)
+
+    def seek(self, playhead):
+        """更新播放位置並重新排序尚未翻譯的批次"""
+        with self._lock:
+            self._playhead = playhead
+            self._heap = [(self._distance(n), n) for _, n in self._heap]
+            heapq.heapify(self._heap)
+
+    def pop(self):
+        """取出最優先的批次編號（沒有剩餘批次時返回 None）"""
+        with self._lock:
+            if not self._heap:
+                return None
+            return heapq.heappop(self._heap)[1]
+
+
+# 進行中翻譯任務的排程器（progress_key -> PlayheadScheduler），供前端回報播放位置
+translation_schedulers = {}
+
+
+def translate_subtitles(subtitles, progress_key=None, update_callback=None, playhead=0.0):
+    """翻譯字幕為中文（直接寫入 subtitles 的 'chinese' 欄位），支持進度追蹤和實時更新
+
+    快取中已有的字幕會先回報，其餘批次依與播放位置的距離排序翻譯，
+    因此進度中的索引與 update_callback 的順序是完成順序而非字幕順序。
+    """
     start_time = time.time()
     
     logger.info(f"[翻譯] 開始翻譯 {len(subtitles)} 條字幕")
@@ -753,86 +2190,322 @@ def translate_subtitles(subtitles, progress_key=None, update_callback=None):
     # 確保翻譯緩存已載入
     load_translation_cache()
     
-    translator = GoogleTranslator(source='en', target='zh-TW')
-    
-    translated = []
-    translated_count = 0
-    cached_count = 0
-    needs_save = False
+    # 收集未緩存的文字（去重並保持字幕順序），依字元預算打包成批次
+    pending_texts = list(dict.fromkeys(
+        sub['english'] for sub in subtitles if sub['english'] not in translation_cache
+    ))
+    batches = plan_translation_batches(pending_texts)
+    batch_index = {text: n for n, batch in enumerate(batches) for text in batch}
+    logger.info(f"[翻譯] 需翻譯 {len(pending_texts)} 條不重複字幕，分為 {len(batches)} 批，並行數 {TRANSLATION_WORKERS}")
     
+    # 每個批次對應的字幕索引與時間
+    batch_lines = [[] for _ in batches]
+    cached_lines = []
     for i, sub in enumerate(subtitles):
-        english_text = sub['english']
-        
-        # 檢查快取（內存和持久化）
-        if english_text in translation_cache:
-            chinese_text = translation_cache[english_text]
-            cached_count += 1
+        if sub['english'] in batch_index:
+            batch_lines[batch_index[sub['english']]].append(i)
         else:
+            cached_lines.append(i)
+    batch_times = [
+        sorted((subtitles[i]['start'], subtitles[i]['end']) for i in lines)
+        for lines in batch_lines
+    ]
+    scheduler = PlayheadScheduler(batch_times, playhead)
+    if progress_key:
+        translation_schedulers[progress_key] = scheduler
+    
+    completed_batches = queue.Queue()
+    cancelled = threading.Event()
+    
+    def translate_worker():
+        # 每個 worker 持續取出最接近播放位置的批次，直到全部翻譯完成
+        while not cancelled.is_set():
+            n = scheduler.pop()
+            if n is None:
+                return
             try:
-                chinese_text = translator.translate(english_text)
-                translation_cache[english_text] = chinese_text
-                translated_count += 1
-                needs_save = True  # 標記需要保存
-                
-                # 每翻譯 10 條顯示進度
-                if translated_count % 10 == 0:
-                    elapsed = time.time() - start_time
-                    logger.info(f"[翻譯] 進度: {i+1}/{len(subtitles)}, 已翻譯 {translated_count} 條, 快取 {cached_count} 條, 耗時 {elapsed:.2f} 秒")
+                # GoogleTranslator 實例在請求間會修改內部狀態，每個批次使用獨立實例
+                translator = GoogleTranslator(source='en', target='zh-TW')
+                results = translate_batch(translator, batches[n])
             except Exception as e:
-                logger.warning(f"[翻譯] 翻譯錯誤 (第 {i+1} 條): {e}")
-                chinese_text = ''
-        
-        # 構建翻譯結果
-        translated_item = {
-            'start': sub['start'],
-            'end': sub['end'],
-            'english': english_text,
-            'chinese': chinese_text
-        }
-        translated.append(translated_item)
+                logger.warning(f"[翻譯] 第 {n + 1} 批翻譯失敗: {e}")
+                results = [None] * len(batches[n])
+            completed_batches.put((n, results))
+    
+    # 有上限的執行緒池並行翻譯
+    executor = ThreadPoolExecutor(max_workers=TRANSLATION_WORKERS, thread_name_prefix='translate')
+    for _ in range(min(TRANSLATION_WORKERS, len(batches))):
+        executor.submit(translate_worker)
+    
+    translated_count = 0
+    cached_count = 0
+    failed_count = 0
+    done_count = 0
+    
+    if progress_key:
+        # 進度只記錄索引，字幕內容直接從任務的字幕陣列讀取
+        translation_progress.attach(progress_key, subtitles)
+    
+    def emit(i, chinese_text):
+        nonlocal done_count
+        sub = subtitles[i]
+        # 先寫回字幕陣列，再記錄索引（讀取進度時才組成回應項目）
+        sub['chinese'] = chinese_text
+        done_count += 1
         
         # 更新進度
         if progress_key:
-            # 確保進度字典存在
-            if progress_key not in translation_progress:
-                translation_progress[progress_key] = {
-                    'current': 0,
-                    'total': len(subtitles),
-                    'translated': 0,
-                    'cached': 0,
-                    'elapsed': 0,
-                    'translated_items': []
-                }
-            
-            # 更新進度資訊
-            translation_progress[progress_key].update({
-                'current': i + 1,
-                'total': len(subtitles),
-                'translated': translated_count,
-                'cached': cached_count,
-                'elapsed': time.time() - start_time
-            })
-            
-            # 存儲已翻譯的字幕（用於實時更新）
-            translation_progress[progress_key]['translated_items'].append(translated_item)
+            translation_progress.record(
+                progress_key, i,
+                current=done_count,
+                translated=translated_count,
+                cached=cached_count,
+                elapsed=time.time() - start_time
+            )
         
         # 調用更新回調（用於實時顯示）
         if update_callback:
-            update_callback(i, translated_item)
+            update_callback(i, {
+                'index': i,
+                'start': sub['start'],
+                'end': sub['end'],
+                'english': sub['english'],
+                'chinese': chinese_text
+            })
     
-    elapsed = time.time() - start_time
-    logger.info(f"[翻譯] 翻譯完成: 總共 {len(subtitles)} 條, 新翻譯 {translated_count} 條, 快取 {cached_count} 條, 總耗時 {elapsed:.2f} 秒")
+    try:
+        # 快取中已有的字幕直接回報
+        for i in cached_lines:
+            cached_count += 1
+            emit(i, translation_cache.get(subtitles[i]['english'], ''))
+        
+        # 按完成順序套用各批次的翻譯結果
+        for batch_count in range(1, len(batches) + 1):
+            n, results = completed_batches.get()
+            fresh = dict(zip(batches[n], results))
+            for text, result in fresh.items():
+                if result is not None:
+                    translation_store.record(text, result)  # 由背景執行緒批次寫入
+            for i in batch_lines[n]:
+                chinese_text = fresh[subtitles[i]['english']]
+                if chinese_text is None:
+                    logger.warning(f"[翻譯] 翻譯錯誤 (第 {i+1} 條)")
+                    failed_count += 1
+                    chinese_text = ''
+                else:
+                    translated_count += 1
+                emit(i, chinese_text)
+            elapsed = time.time() - start_time
+            logger.info(f"[翻譯] 進度: {done_count}/{len(subtitles)}, 已完成 {batch_count}/{len(batches)} 批, 快取 {cached_count} 條, 耗時 {elapsed:.2f} 秒")
+    finally:
+        cancelled.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+        if progress_key:
+            translation_schedulers.pop(progress_key, None)
     
-    # 如果有新翻譯，保存翻譯緩存
-    if needs_save:
-        save_translation_cache()
-        logger.info(f"[翻譯緩存] 已保存 {translated_count} 條新翻譯到緩存")
+    elapsed = time.time() - start_time
+    logger.info(f"[翻譯] 翻譯完成: 總共 {len(subtitles)} 條, 新翻譯 {translated_count} 條, 快取 {cached_count} 條, 失敗 {failed_count} 條, 總耗時 {elapsed:.2f} 秒")
     
     # 標記完成
     if progress_key:
-        translation_progress[progress_key]['completed'] = True
+        translation_progress.complete(progress_key)
+    
+    return subtitles
+
+
+# 背景任務執行器設定：同時執行的任務數、排隊任務上限
+BACKGROUND_WORKERS = max(1, int(os.environ.get('BACKGROUND_WORKERS', 2)))
+BACKGROUND_QUEUE_SIZE = max(1, int(os.environ.get('BACKGROUND_QUEUE_SIZE', 20)))
+
+
+class JobQueueFull(Exception):
+    """背景任務佇列已滿"""
+
+
+class BackgroundJob:
+    """背景任務狀態（queued / running / done / failed）"""
+
+    def __init__(self, job_id, kind, func, args):
+        self.id = job_id
+        self.kind = kind
+        self.func = func
+        self.args = args
+        self.state = 'queued'
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self):
+        now = time.time()
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'state': self.state,
+            'error': self.error,
+            'created_at': datetime.fromtimestamp(self.created_at).isoformat(),
+            'wait_seconds': round((self.started_at or now) - self.created_at, 2),
+            'run_seconds': round((self.finished_at or now) - self.started_at, 2) if self.started_at else 0
+        }
+
+
+class JobExecutor:
+    """有上限的背景任務執行器：固定數量的 worker、排隊上限（滿時拒絕）、任務狀態與統計"""
+
+    def __init__(self, max_workers, max_queue, history_size=100):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._jobs = {}  # 排隊中與執行中的任務
+        self._history = deque(maxlen=history_size)  # 最近完成的任務
+        self._workers = []
+        self._stopping = False
+        self._counters = {'submitted': 0, 'rejected': 0, 'done': 0, 'failed': 0}
+
+    def _ensure_workers(self):
+        # worker 延遲到第一次提交時才啟動（gunicorn fork 之後）
+        while len(self._workers) < self.max_workers:
+            worker = threading.Thread(target=self._run, name=f'job-worker-{len(self._workers)}', daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, job_id, kind, func, *args):
+        """提交任務；佇列已滿或執行器已停止時拋出 JobQueueFull"""
+        job = BackgroundJob(job_id, kind, func, args)
+        with self._lock:
+            if self._stopping:
+                raise JobQueueFull('執行器已停止')
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                self._counters['rejected'] += 1
+                raise JobQueueFull(f'背景任務佇列已滿（{self.max_queue}）')
+            self._jobs[job_id] = job
+            self._counters['submitted'] += 1
+            self._ensure_workers()
+        logger.info(f"[背景任務] 已排入 {kind} 任務: {job_id}（排隊 {self._queue.qsize()}）")
+        return job
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            job.state = 'running'
+            job.started_at = time.time()
+            try:
+                job.func(*job.args)
+                job.state = 'done'
+            except Exception as e:
+                job.state = 'failed'
+                job.error = str(e)
+                logger.error(f"[背景任務] {job.kind} 任務失敗: {job.id}: {e}", exc_info=True)
+            finally:
+                job.finished_at = time.time()
+                with self._lock:
+                    self._jobs.pop(job.id, None)
+                    self._history.append(job)
+                    self._counters[job.state] += 1
+
+    def queued(self):
+        """排隊中（尚未開始）的任務數"""
+        return self._queue.qsize()
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                job = next((j for j in self._history if j.id == job_id), None)
+        return job
+
+    def stats(self):
+        with self._lock:
+            active = list(self._jobs.values())
+            recent = list(self._history)
+        return {
+            'workers': self.max_workers,
+            'queue_limit': self.max_queue,
+            'queued': sum(1 for job in active if job.state == 'queued'),
+            'running': sum(1 for job in active if job.state == 'running'),
+            **self._counters,
+            'jobs': [job.to_dict() for job in active],
+            'recent': [job.to_dict() for job in reversed(recent)]
+        }
+
+    def shutdown(self, timeout=5):
+        """停止接收新任務，通知 worker 在處理完目前任務後結束"""
+        with self._lock:
+            self._stopping = True
+            workers = list(self._workers)
+        for _ in workers:
+            try:
+                self._queue.put(None, timeout=timeout)
+            except queue.Full:
+                break
+        deadline = time.time() + timeout
+        for worker in workers:
+            worker.join(max(0, deadline - time.time()))
+
+
+# 翻譯與預取等背景任務共用的執行器
+background_jobs = JobExecutor(BACKGROUND_WORKERS, BACKGROUND_QUEUE_SIZE)
+atexit.register(background_jobs.shutdown)
+
+# 單字預取使用獨立的單一 worker，不佔用字幕翻譯的 worker
+vocabulary_jobs = JobExecutor(1, max(1, int(os.environ.get('VOCAB_PREFETCH_QUEUE_SIZE', 10))), history_size=200)
+atexit.register(vocabulary_jobs.shutdown)
+
+
+# 進行中的字幕翻譯任務（video_id -> {'progress_key', 'subtitles'}），同一影片只翻譯一次
+translation_jobs = {}
+translation_jobs_lock = threading.Lock()
+
+
+def get_or_start_translation_job(video_id, subtitles, playhead=0.0):
+    """取得影片進行中的翻譯任務，沒有時排入背景執行器；返回 (任務, 是否新建)
+
+    背景任務佇列已滿時拋出 JobQueueFull。
+    """
+    with translation_jobs_lock:
+        job = translation_jobs.get(video_id)
+        if job is not None:
+            return job, False
+        
+        logger.info(f"[API] 中文字幕不足，啟動翻譯機制...")
+        progress_key = f"{video_id}_{int(time.time())}"
+        translation_progress.create(progress_key, len(subtitles))
+        job = translation_jobs[video_id] = {
+            'progress_key': progress_key,
+            'subtitles': subtitles
+        }
+    
+    # 在背景執行翻譯
+    def translate_in_background():
+        def update_callback(index, translated_item):
+            # 更新原始字幕陣列
+            if index < len(subtitles):
+                subtitles[index]['chinese'] = translated_item['chinese']
+        
+        try:
+            translate_subtitles(subtitles, progress_key, update_callback, playhead)
+            
+            # 翻譯完成後，更新字幕緩存
+            subtitle_cache.put(video_id, subtitles)  # 使用已更新的字幕（包含翻譯）
+            logger.info(f"[字幕緩存] 翻譯完成後已更新字幕緩存，video_id: {video_id}")
+        finally:
+            # 緩存更新後才移除任務，之後的請求會直接讀到已翻譯的字幕
+            with translation_jobs_lock:
+                translation_jobs.pop(video_id, None)
     
-    return translated
+    try:
+        background_jobs.submit(progress_key, 'translation', translate_in_background)
+    except JobQueueFull:
+        with translation_jobs_lock:
+            translation_jobs.pop(video_id, None)
+        translation_progress.pop(progress_key, None)
+        raise
+    return job, True
 
 
 @app.route('/')
@@ -841,6 +2514,90 @@ def index():
     return render_template('index.html')
 
 
+class SubtitleResponseCache:
+    """已完成翻譯的 /api/subtitles 回應：每個緩存版本只序列化、壓縮一次（記憶體 LRU）"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # video_id -> 回應（含版本、ETag 與各編碼的內容）
+
+    def get(self, video_id, version):
+        with self._lock:
+            entry = self._entries.get(video_id)
+            if entry is None or entry['version'] != version:
+                return None
+            self._entries.move_to_end(video_id)
+            return entry
+
+    def put(self, video_id, version, payload):
+        """序列化並預先壓縮回應內容（gzip 固定 mtime，各 worker 產生相同的位元組）"""
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        encodings = {'identity': body, 'gzip': gzip.compress(body, compresslevel=6, mtime=0)}
+        if brotli is not None:
+            encodings['br'] = brotli.compress(body, quality=5)
+        entry = {
+            'version': version,
+            'etag': hashlib.sha1(f'{video_id}:{version}'.encode('utf-8')).hexdigest(),
+            'encodings': encodings
+        }
+        with self._lock:
+            self._entries[video_id] = entry
+            self._entries.move_to_end(video_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+
+subtitle_responses = SubtitleResponseCache(
+    max(1, int(os.environ.get('SUBTITLE_RESPONSE_CACHE_SIZE', 64)))
+)
+
+
+def negotiate_encoding(available):
+    """依 Accept-Encoding 選擇回應編碼（br 優先於 gzip）"""
+    for encoding in ('br', 'gzip'):
+        if encoding in available and request.accept_encodings[encoding] > 0:
+            return encoding
+    return 'identity'
+
+
+def send_subtitle_response(entry):
+    """返回預先計算的字幕回應（強 ETag；If-None-Match 命中時返回 304）
+
+    強 ETag 代表逐位元組相同的內容，因此壓縮後的版本附上編碼後綴（如 "<etag>-gzip"）。
+    """
+    encoding = negotiate_encoding(entry['encodings'])
+    etag = entry['etag'] if encoding == 'identity' else f'{entry["etag"]}-{encoding}'
+    headers = {
+        'ETag': f'"{etag}"',
+        'Cache-Control': 'no-cache',  # 每次都向伺服器確認，內容未變時只返回 304
+        'Vary': 'Accept-Encoding'
+    }
+    if request.if_none_match.contains(etag):
+        return Response(status=304, headers=headers)
+    
+    if encoding != 'identity':
+        headers['Content-Encoding'] = encoding
+    return Response(entry['encodings'][encoding], mimetype='application/json', headers=headers)
+
+
+def subtitle_failure_response(failure):
+    """依失敗記錄返回錯誤（被限流時附上 Retry-After）"""
+    if failure['kind'] == SubtitleFailureCache.NO_CAPTIONS:
+        return jsonify({
+            'error': '無法獲取字幕。此影片可能沒有字幕或字幕不可用。'
+        }), 404
+    
+    retry_after = max(1, int(failure['expires_at'] - time.time()))
+    response = jsonify({
+        'error': f'暫時無法獲取字幕，請約 {retry_after} 秒後再試。',
+        'retry_after': retry_after
+    })
+    response.headers['Retry-After'] = str(retry_after)
+    return response, 503
+
+
 @app.route('/api/subtitles/<video_id>')
 def get_subtitles_api(video_id):
     """API：獲取字幕（直接從 YouTube 獲取英文和中文字幕，如果沒有中文則啟動翻譯）"""
@@ -851,6 +2608,20 @@ def get_subtitles_api(video_id):
         logger.info(f"[API] video_id: {video_id}")
         logger.info(f"[API] 時間: {time.strftime('%Y-%m-%d %H:%M:%S')}")
         
+        # 已完成翻譯的影片直接返回預先壓縮的回應（或 304）
+        cache_version = subtitle_cache.version(video_id)
+        if cache_version is not None:
+            prepared = subtitle_responses.get(video_id, cache_version)
+            if prepared is not None:
+                logger.info(f"[API] 使用預先計算的回應，video_id: {video_id}")
+                return send_subtitle_response(prepared)
+        
+        # 近期已確認抓取失敗的影片直接返回，不再重複嘗試
+        failure = subtitle_failures.get(video_id)
+        if failure is not None and get_cached_subtitles(video_id) is None:
+            logger.info(f"[API] 命中失敗記錄 ({failure['kind']})，video_id: {video_id}")
+            return subtitle_failure_response(failure)
+        
         # 獲取英文字幕和中文字幕
         logger.info(f"[API] 開始獲取字幕...")
         fetch_start = time.time()
@@ -860,6 +2631,9 @@ def get_subtitles_api(video_id):
         
         if not subtitles:
             logger.warning(f"[API] 無法獲取字幕，video_id: {video_id}")
+            failure = subtitle_failures.get(video_id)
+            if failure is not None:
+                return subtitle_failure_response(failure)
             return jsonify({
                 'error': '無法獲取字幕。此影片可能沒有字幕或字幕不可用。'
             }), 404
@@ -868,38 +2642,30 @@ def get_subtitles_api(video_id):
         has_chinese = sum(1 for s in subtitles if s.get('chinese', ''))
         logger.info(f"[API] 字幕統計: 總共 {len(subtitles)} 條，其中 {has_chinese} 條有中文")
         
-        # 如果中文字幕少於 10%，啟動翻譯
+        # 如果中文字幕少於 10%，啟動翻譯（從目前播放位置附近開始翻譯）
         if has_chinese < len(subtitles) * 0.1:
-            logger.info(f"[API] 中文字幕不足，啟動翻譯機制...")
-            progress_key = f"{video_id}_{int(time.time())}"
-            translation_progress[progress_key] = {
-                'current': 0, 
-                'total': len(subtitles), 
-                'completed': False,
-                'translated_items': []
-            }
+            playhead = request.args.get('t', 0.0, type=float)
+            try:
+                job, created = get_or_start_translation_job(video_id, subtitles, playhead)
+            except JobQueueFull as e:
+                # 伺服器忙碌時先返回現有字幕，稍後重新載入即可再啟動翻譯
+                logger.warning(f"[API] 無法啟動翻譯: {e}")
+                return jsonify({
+                    'video_id': video_id,
+                    'subtitles': subtitles,
+                    'needs_translation': False,
+                    'translation_rejected': True
+                })
+            progress_key = job['progress_key']
             
-            # 在背景執行翻譯
-            def translate_in_background():
-                def update_callback(index, translated_item):
-                    # 更新原始字幕陣列
-                    if index < len(subtitles):
-                        subtitles[index]['chinese'] = translated_item['chinese']
-                
-                translated = translate_subtitles(subtitles, progress_key, update_callback)
-                
-                # 翻譯完成後，更新字幕緩存
-                subtitle_cache = load_subtitle_cache()
-                subtitle_cache[video_id] = {
-                    'subtitles': subtitles,  # 使用已更新的字幕（包含翻譯）
-                    'cached_at': datetime.now().isoformat()
-                }
-                save_subtitle_cache(subtitle_cache)
-                logger.info(f"[字幕緩存] 翻譯完成後已更新字幕緩存，video_id: {video_id}")
+            # 在背景預取影片中較難的單字（排在翻譯之後），讓第一次點擊就命中緩存
+            start_vocabulary_prefetch(video_id, subtitles)
             
-            thread = threading.Thread(target=translate_in_background)
-            thread.daemon = True
-            thread.start()
+            if not created:
+                # 加入進行中的翻譯任務，返回其字幕（含已翻譯的部分）
+                logger.info(f"[API] 影片已有進行中的翻譯，共用進度: {progress_key}")
+                subtitles = job['subtitles']
+                has_chinese = sum(1 for s in subtitles if s.get('chinese', ''))
             
             return jsonify({
                 'video_id': video_id,
@@ -910,16 +2676,24 @@ def get_subtitles_api(video_id):
                 'total': len(subtitles)
             })
         else:
+            # 在背景預取影片中較難的單字，讓第一次點擊就命中緩存
+            start_vocabulary_prefetch(video_id, subtitles)
+            
             total_elapsed = time.time() - start_time
             logger.info(f"[API] ========== 處理完成 ==========")
             logger.info(f"[API] 總耗時: {total_elapsed:.2f} 秒")
             logger.info(f"[API] 返回 {len(subtitles)} 條字幕")
             
-            return jsonify({
+            payload = {
                 'video_id': video_id,
                 'subtitles': subtitles,
                 'needs_translation': False
-            })
+            }
+            # 只有讀取前後緩存版本一致時才保存預先計算的回應
+            version = subtitle_cache.version(video_id)
+            if version is None or (cache_version is not None and version != cache_version):
+                return jsonify(payload)
+            return send_subtitle_response(subtitle_responses.put(video_id, version, payload))
         
     except Exception as e:
         elapsed = time.time() - start_time
@@ -936,31 +2710,116 @@ def get_subtitles_api(video_id):
 @app.route('/api/translation-progress/<progress_key>')
 def get_translation_progress(progress_key):
     """API：獲取翻譯進度和已翻譯的字幕"""
-    progress = translation_progress.get(progress_key, None)
-    if progress is None:
+    # 返回進度和上次請求後的新翻譯項目
+    last_index = request.args.get('last_index', 0, type=int)
+    result = translation_progress.snapshot(progress_key, last_index)
+    if result is None:
         return jsonify({'error': '找不到進度資訊'}), 404
     
-    # 返回進度和新翻譯的字幕項目
-    result = {
-        'current': progress.get('current', 0),
-        'total': progress.get('total', 0),
-        'translated': progress.get('translated', 0),
-        'cached': progress.get('cached', 0),
-        'elapsed': progress.get('elapsed', 0),
-        'completed': progress.get('completed', False)
-    }
+    return jsonify(result)
+
+
+def format_sse(event, data, event_id=None):
+    """組成一則 Server-Sent Events 訊息"""
+    message = ''
+    if event_id is not None:
+        message += f'id: {event_id}\n'
+    message += f'event: {event}\n'
+    message += f'data: {json.dumps(data, ensure_ascii=False)}\n\n'
+    return message
+
+
+@app.route('/api/translation-progress/<progress_key>/stream')
+def stream_translation_progress(progress_key):
+    """API：以 Server-Sent Events 推送翻譯進度
     
-    # 獲取上次請求後的新翻譯項目
-    last_index = request.args.get('last_index', 0, type=int)
-    translated_items = progress.get('translated_items', [])
-    new_items = translated_items[last_index:] if last_index < len(translated_items) else []
+    每則 progress 事件的 id 即為 last_index，瀏覽器斷線重連時會以
+    Last-Event-ID 帶回，從中斷處繼續推送。單次連線最長維持
+    TRANSLATION_PROGRESS_STREAM_SECONDS 秒，之後由瀏覽器自動重連，
+    避免長時間佔用 worker。
+    """
+    last_event_id = request.headers.get('Last-Event-ID', '')
+    if last_event_id.isdigit():
+        last_index = int(last_event_id)
+    else:
+        last_index = request.args.get('last_index', 0, type=int)
+    
+    if progress_key not in translation_progress:
+        return jsonify({'error': '找不到進度資訊'}), 404
     
-    result['new_items'] = new_items
-    result['last_index'] = len(translated_items)
+    def generate():
+        nonlocal last_index
+        deadline = time.time() + PROGRESS_STREAM_SECONDS
+        yield f'retry: {PROGRESS_STREAM_RETRY_MS}\n\n'
+        while time.time() < deadline:
+            result = translation_progress.wait(
+                progress_key, last_index,
+                timeout=min(PROGRESS_STREAM_KEEPALIVE, max(0.0, deadline - time.time()))
+            )
+            if result is None:
+                yield format_sse('not_found', {'error': '找不到進度資訊'})
+                return
+            if result['new_items'] or result['last_index'] != last_index:
+                last_index = result['last_index']
+                yield format_sse('progress', result, event_id=last_index)
+            elif not result['completed']:
+                # 保持連線，避免代理伺服器因閒置而中斷
+                yield ': keepalive\n\n'
+            if result['completed']:
+                yield format_sse('complete', {'last_index': last_index}, event_id=last_index)
+                return
     
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+
+@app.route('/api/http-stats')
+def get_http_stats():
+    """API：對外 HTTP 請求的各主機統計（請求數、錯誤數、延遲）"""
+    return jsonify(http_client.stats())
+
+
+@app.route('/api/jobs')
+def get_jobs_status():
+    """API：背景任務執行器狀態（worker 數、排隊深度、各任務狀態）"""
+    result = background_jobs.stats()
+    result['vocabulary'] = vocabulary_jobs.stats()
     return jsonify(result)
 
 
+@app.route('/api/jobs/<path:job_id>')
+def get_job_status(job_id):
+    """API：單一背景任務狀態"""
+    job = background_jobs.get(job_id) or vocabulary_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': '找不到任務'}), 404
+    return jsonify(job.to_dict())
+
+
+@app.route('/api/translation-progress/<progress_key>/seek', methods=['POST'])
+def report_translation_seek(progress_key):
+    """API：回報目前播放位置，讓翻譯任務優先翻譯即將播放的字幕"""
+    data = request.get_json(silent=True) or {}
+    try:
+        playhead = float(data.get('time'))
+    except (TypeError, ValueError):
+        return jsonify({'error': '缺少或無效的 time 參數'}), 400
+    
+    scheduler = translation_schedulers.get(progress_key)
+    if scheduler is None:
+        return jsonify({'error': '找不到進行中的翻譯'}), 404
+    
+    scheduler.seek(playhead)
+    logger.info(f"[翻譯] 播放位置更新為 {playhead:.1f} 秒，重新排序翻譯批次，progress_key: {progress_key}")
+    return jsonify({'success': True})
+
+
 @app.route('/api/subtitles/<video_id>/update')
 def update_subtitles_api(video_id):
     """API：更新字幕（翻譯完成後調用）"""
@@ -968,8 +2827,7 @@ def update_subtitles_api(video_id):
     if not progress_key:
         return jsonify({'error': '缺少 progress_key 參數'}), 400
     
-    progress = translation_progress.get(progress_key)
-    if not progress or not progress.get('completed'):
+    if not translation_progress.is_completed(progress_key):
         return jsonify({'error': '翻譯尚未完成'}), 400
     
     # 重新獲取字幕（此時應該已經翻譯完成）
@@ -984,12 +2842,323 @@ def update_subtitles_api(video_id):
     })
 
 
+class WordInfoCache:
+    """單字資訊兩層緩存：記憶體 LRU + SQLite 持久層（跨 worker 共用），皆有到期時間"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS word_info (
+            word TEXT PRIMARY KEY,
+            data TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        );
+    """
+
+    def __init__(self, path, ttl, max_memory):
+        self.path = path
+        self.ttl = ttl
+        self.max_memory = max_memory
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # word -> (expires_at, result)
+        self._local = threading.local()
+        self._conn().executescript(self.SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = connect_sqlite(self.path)
+            self._local.conn = conn
+        return conn
+
+    def _remember(self, word, expires_at, result):
+        with self._lock:
+            self._memory[word] = (expires_at, result)
+            self._memory.move_to_end(word)
+            while len(self._memory) > self.max_memory:
+                self._memory.popitem(last=False)
+
+    def get(self, word):
+        """返回未過期的單字資訊（未緩存時返回 None）"""
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(word)
+            if cached is not None:
+                if cached[0] > now:
+                    self._memory.move_to_end(word)
+                    return cached[1]
+                del self._memory[word]
+        try:
+            row = self._conn().execute(
+                'SELECT data, expires_at FROM word_info WHERE word = ?', (word,)
+            ).fetchone()
+        except Exception as e:
+            logger.warning(f"[單字緩存] 讀取失敗: {e}")
+            return None
+        if row is None or row[1] <= now:
+            return None
+        result = json.loads(row[0])
+        self._remember(word, row[1], result)
+        return result
+
+    def put(self, word, result):
+        expires_at = time.time() + self.ttl
+        self._remember(word, expires_at, result)
+        try:
+            self._conn().execute(
+                'INSERT OR REPLACE INTO word_info (word, data, expires_at) VALUES (?, ?, ?)',
+                (word, json.dumps(result, ensure_ascii=False), expires_at)
+            )
+        except Exception as e:
+            logger.warning(f"[單字緩存] 保存失敗: {e}")
+
+    def purge_expired(self):
+        """刪除持久層中已過期的項目"""
+        try:
+            self._conn().execute('DELETE FROM word_info WHERE expires_at <= ?', (time.time(),))
+        except Exception as e:
+            logger.warning(f"[單字緩存] 清理失敗: {e}")
+
+
+word_info_cache = WordInfoCache(
+    WORD_INFO_CACHE_FILE,
+    ttl=float(os.environ.get('WORD_INFO_CACHE_TTL', 30)) * 24 * 3600,
+    max_memory=max(1, int(os.environ.get('WORD_INFO_CACHE_SIZE', 2000)))
+)
+word_info_cache.purge_expired()
+
+# 翻譯失敗時顯示的文字（含此文字的結果不寫入緩存）
+TRANSLATION_FAILED_TEXT = '（翻譯失敗，請稍後再試）'
+
+
+class WordInfoNotFound(Exception):
+    """字典與翻譯都無法提供此文字的資訊"""
+
+
+def normalize_word_key(text):
+    """單字緩存的鍵：小寫並合併空白"""
+    return ' '.join(text.lower().split())
+
+
+def is_complete_word_info(result):
+    """結果中所有翻譯都成功（可以寫入緩存）"""
+    if not result.get('wordTranslation'):
+        return False
+    for meaning in result.get('meanings', []):
+        for definition in meaning.get('definitions', []):
+            if TRANSLATION_FAILED_TEXT in (definition.get('definitionZh'), definition.get('exampleZh')):
+                return False
+    return True
+
+
+def translate_phrase_info(clean_text):
+    """將文字作為片語直接翻譯"""
+    phrase_translation = translate_texts([clean_text]).get(clean_text)
+    if not phrase_translation:
+        logger.warning(f"[單字API] 片語翻譯失敗: {clean_text}")
+        raise WordInfoNotFound('無法獲取此文字的資訊')
+    logger.info(f"[單字API] 片語翻譯成功: {clean_text} -> {phrase_translation}")
+
+    return {
+        'word': clean_text,
+        'wordTranslation': phrase_translation,
+        'phonetic': '',
+        'meanings': [],
+        'isPhrase': True
+    }
+
+
+def build_word_info(clean_text):
+    """查詢字典並翻譯，組合單字資訊（找不到時拋出 WordInfoNotFound）"""
+    # 檢查是否為片語（包含空格）：作為片語處理（直接翻譯）
+    if ' ' in clean_text:
+        return translate_phrase_info(clean_text)
+
+    # 使用 Free Dictionary API（用於單字）
+    api_url = f'https://api.dictionaryapi.dev/api/v2/entries/en/{clean_text}'
+
+    response = http_client.get(api_url, timeout=10)
+    if response.status_code == 404:
+        # 如果字典API找不到，嘗試作為片語翻譯
+        logger.info(f"[單字API] 單字找不到，改為片語翻譯: {clean_text}")
+        return translate_phrase_info(clean_text)
+    response.raise_for_status()
+    data = response.json()
+
+    if not data or len(data) == 0:
+        raise WordInfoNotFound('找不到此單字的資訊')
+
+    # 處理第一個結果
+    entry = data[0]
+
+    # 提取音標
+    phonetic = entry.get('phonetic', '')
+    if not phonetic and entry.get('phonetics'):
+        for ph in entry['phonetics']:
+            if ph.get('text'):
+                phonetic = ph['text']
+                break
+
+    # 提取詞義和例句（每個詞性最多3個定義）
+    entry_meanings = [
+        (meaning, meaning.get('definitions', [])[:3])
+        for meaning in entry.get('meanings', [])
+    ]
+
+    # 單字本身、所有定義與例句一次翻譯為中文
+    texts = [clean_text]
+    for _, def_items in entry_meanings:
+        for def_item in def_items:
+            texts.extend(text for text in (def_item.get('definition', ''), def_item.get('example', '')) if text)
+    translations = translate_texts(texts)
+    logger.info(f"[單字API] 翻譯完成: {clean_text}，共 {len(translations)} 條文字")
+
+    def translated(text):
+        if not text:
+            return ''
+        result = translations.get(text)
+        if result is None:
+            logger.warning(f"[單字API] 翻譯失敗: {text[:50]}")
+            return TRANSLATION_FAILED_TEXT
+        return result
+
+    meanings = []
+    for meaning, def_items in entry_meanings:
+        definitions = []
+        for def_item in def_items:
+            definition_text = def_item.get('definition', '')
+            example = def_item.get('example', '')
+            definition_zh = translated(definition_text)
+            example_zh = translated(example)
+
+            definitions.append({
+                'definition': definition_text,
+                'definitionZh': definition_zh if definition_zh else ('（翻譯中...）' if definition_text else ''),
+                'example': example,
+                'exampleZh': example_zh if example_zh else ('（翻譯中...）' if example else '')
+            })
+
+        meaning_data = {
+            'partOfSpeech': meaning.get('partOfSpeech', ''),
+            'definitions': definitions
+        }
+
+        # 添加同義詞
+        if meaning.get('synonyms'):
+            meaning_data['synonyms'] = meaning['synonyms']
+
+        meanings.append(meaning_data)
+
+    # 單字本身的翻譯（失敗時留空）
+    word_translation = translations.get(clean_text) or ''
+
+    return {
+        'word': clean_text,
+        'wordTranslation': word_translation,
+        'phonetic': phonetic,
+        'meanings': meanings,
+        'isPhrase': False
+    }
+
+
+def get_word_info_cached(clean_text):
+    """先查單字緩存，未命中時查詢並在翻譯完整時寫入緩存"""
+    key = normalize_word_key(clean_text)
+    cached = word_info_cache.get(key)
+    if cached is not None:
+        logger.info(f"[單字緩存] 命中: {key}")
+        return dict(cached, word=clean_text)
+
+    result = build_word_info(clean_text)
+    if is_complete_word_info(result):
+        word_info_cache.put(key, result)
+    return result
+
+
+# 單字預取：每部影片最多預先查詢的單字數（0 表示停用）
+VOCAB_PREFETCH_BUDGET = max(0, int(os.environ.get('VOCAB_PREFETCH_BUDGET', 30)))
+
+# 字幕翻譯忙碌時，單字預取每次暫停的秒數
+VOCAB_PREFETCH_PAUSE = 0.5
+
+# 預取時略過的短字與常用字（學習者很少需要查詢）
+VOCAB_MIN_LENGTH = 4
+COMMON_WORDS = frozenset("""
+    about after again also always another around back because been before being
+    between both came come could does doing done down each even ever every first
+    from gets give going gone good got great have having here into just keep know
+    last like little long look made make many maybe more most much must need never
+    next only other over people really right said same should show some something
+    still such sure take tell than thank thanks that their them then there these
+    they thing things think this those though through time today told very want
+    were what when where which while will with work would yeah year years your
+    okay gonna wanna
+""".split())
+
+
+def rank_vocabulary(subtitles):
+    """從字幕中挑出值得預取的單字，依稀有程度排序
+
+    沒有詞頻表可用，以字長作為稀有程度的近似（越長的字通常越少見），
+    同樣長度時優先在影片中出現較多次的字，最後依首次出現的順序。
+    """
+    counts = {}
+    first_seen = {}
+    for sub in subtitles:
+        for match in WORD_PATTERN.finditer(sub.get('english', '')):
+            word = match.group().lower()
+            # 縮寫與連字號複合字通常查不到字典
+            if len(word) < VOCAB_MIN_LENGTH or word in COMMON_WORDS or not word.isalpha():
+                continue
+            counts[word] = counts.get(word, 0) + 1
+            first_seen.setdefault(word, len(first_seen))
+    return sorted(counts, key=lambda word: (-min(len(word), 10), -counts[word], first_seen[word]))
+
+
+def wait_for_idle_translation():
+    """字幕翻譯有任務排隊或翻譯速率限制的令牌用完時暫停，讓出給使用者的請求"""
+    while background_jobs.queued() > 0 or translation_rate_limiter.available() < 1:
+        time.sleep(VOCAB_PREFETCH_PAUSE)
+
+
+def prefetch_vocabulary(video_id, words, budget):
+    """預先查詢單字並寫入單字緩存（已緩存的字不計入預算）"""
+    fetched = 0
+    skipped = 0
+    for word in words:
+        if fetched >= budget:
+            break
+        if word_info_cache.get(normalize_word_key(word)) is not None:
+            skipped += 1
+            continue
+        wait_for_idle_translation()
+        fetched += 1
+        try:
+            get_word_info_cached(word)
+        except WordInfoNotFound:
+            continue
+        except Exception as e:
+            logger.warning(f"[單字預取] 查詢 {word} 失敗: {e}")
+    logger.info(f"[單字預取] 完成 {video_id}: 查詢 {fetched} 個單字，{skipped} 個已在緩存")
+
+
+def start_vocabulary_prefetch(video_id, subtitles):
+    """在背景預取影片中較難的單字（獨立的低優先序執行器；同一部影片只排入一次；佇列已滿時略過）"""
+    if VOCAB_PREFETCH_BUDGET <= 0:
+        return
+    job_id = f'vocab:{video_id}'
+    if vocabulary_jobs.get(job_id) is not None:
+        return
+    words = rank_vocabulary(subtitles)
+    if not words:
+        return
+    try:
+        vocabulary_jobs.submit(job_id, 'vocabulary', prefetch_vocabulary, video_id, words, VOCAB_PREFETCH_BUDGET)
+    except JobQueueFull as e:
+        logger.info(f"[單字預取] 略過 {video_id}: {e}")
+
+
 @app.route('/api/word/<path:text>')
 def get_word_info(text):
     """API：獲取單字資訊（定義、例句等）"""
-    import urllib.request
-    import json as json_lib
-    
     try:
         logger.info(f"[單字API] 查詢文字: {text}")
 
@@ -998,155 +3167,13 @@ def get_word_info(text):
         if not clean_text:
             return jsonify({'error': '文字不能為空'}), 400
 
-        # 檢查是否為片語（包含空格）
-        is_phrase = ' ' in clean_text
-
-        # 檢查是否為片語
-        if is_phrase:
-            # 作為片語處理（直接翻譯）
-            try:
-                translator = GoogleTranslator(source='en', target='zh-TW')
-                phrase_translation = translator.translate(clean_text)
-                logger.info(f"[單字API] 片語翻譯成功: {clean_text} -> {phrase_translation}")
-
-                result = {
-                    'word': clean_text,
-                    'wordTranslation': phrase_translation,
-                    'phonetic': '',
-                    'meanings': [],
-                    'isPhrase': True
-                }
-
-                logger.info(f"[單字API] 成功處理片語: {clean_text}")
-                return jsonify(result)
-
-            except Exception as e:
-                logger.warning(f"[單字API] 片語翻譯失敗: {e}")
-                return jsonify({
-                    'error': '無法獲取此文字的資訊'
-                }), 404
-        else:
-            # 使用 Free Dictionary API（用於單字）
-            api_url = f'https://api.dictionaryapi.dev/api/v2/entries/en/{clean_text}'
-
-            try:
-                with urllib.request.urlopen(api_url, timeout=10) as response:
-                    data = json_lib.loads(response.read().decode('utf-8'))
-
-                    if not data or len(data) == 0:
-                        return jsonify({
-                            'error': '找不到此單字的資訊'
-                        }), 404
-
-                    # 處理第一個結果
-                    entry = data[0]
-
-                    # 提取音標
-                    phonetic = entry.get('phonetic', '')
-                    if not phonetic and entry.get('phonetics'):
-                        for ph in entry['phonetics']:
-                            if ph.get('text'):
-                                phonetic = ph['text']
-                                break
-
-                    # 提取詞義和例句
-                    meanings = []
-                    for meaning in entry.get('meanings', []):
-                        part_of_speech = meaning.get('partOfSpeech', '')
-                        definitions = []
-
-                        for def_item in meaning.get('definitions', [])[:3]:  # 最多3個定義
-                            definition_text = def_item.get('definition', '')
-                            example = def_item.get('example', '')
-
-                            # 翻譯定義為中文
-                            definition_zh = ''
-                            if definition_text:
-                                try:
-                                    translator = GoogleTranslator(source='en', target='zh-TW')
-                                    definition_zh = translator.translate(definition_text)
-                                    logger.info(f"[單字API] 定義翻譯成功: {definition_text[:50]}... -> {definition_zh}")
-                                except Exception as e:
-                                    logger.warning(f"[單字API] 翻譯定義失敗: {e}")
-                                    definition_zh = '（翻譯失敗，請稍後再試）'
-
-                            # 翻譯例句為中文（確保所有例句都有翻譯）
-                            example_zh = ''
-                            if example:
-                                try:
-                                    translator = GoogleTranslator(source='en', target='zh-TW')
-                                    example_zh = translator.translate(example)
-                                    logger.info(f"[單字API] 例句翻譯成功: {example} -> {example_zh}")
-                                except Exception as e:
-                                    logger.warning(f"[單字API] 翻譯例句失敗: {e}")
-                                    # 如果翻譯失敗，至少顯示提示
-                                    example_zh = '（翻譯失敗，請稍後再試）'
-
-                            definitions.append({
-                                'definition': definition_text,
-                                'definitionZh': definition_zh if definition_zh else ('（翻譯中...）' if definition_text else ''),
-                                'example': example,
-                                'exampleZh': example_zh if example_zh else ('（翻譯中...）' if example else '')
-                            })
-
-                        meaning_data = {
-                            'partOfSpeech': part_of_speech,
-                            'definitions': definitions
-                        }
-
-                        # 添加同義詞
-                        if meaning.get('synonyms'):
-                            meaning_data['synonyms'] = meaning['synonyms']
-
-                        meanings.append(meaning_data)
-
-                    # 翻譯單字本身為中文
-                    word_translation = ''
-                    try:
-                        translator = GoogleTranslator(source='en', target='zh-TW')
-                        word_translation = translator.translate(clean_text)
-                        logger.info(f"[單字API] 單字翻譯成功: {clean_text} -> {word_translation}")
-                    except Exception as e:
-                        logger.warning(f"[單字API] 翻譯單字失敗: {e}")
-                        word_translation = ''
-
-                    result = {
-                        'word': clean_text,
-                        'wordTranslation': word_translation,
-                        'phonetic': phonetic,
-                        'meanings': meanings,
-                        'isPhrase': False
-                    }
-
-                    logger.info(f"[單字API] 成功獲取單字資訊: {clean_text}")
-                    return jsonify(result)
-
-            except urllib.error.HTTPError as e:
-                if e.code == 404:
-                    # 如果字典API找不到，嘗試作為片語翻譯
-                    try:
-                        translator = GoogleTranslator(source='en', target='zh-TW')
-                        phrase_translation = translator.translate(clean_text)
-                        logger.info(f"[單字API] 單字找不到，改為片語翻譯成功: {clean_text} -> {phrase_translation}")
-
-                        result = {
-                            'word': clean_text,
-                            'wordTranslation': phrase_translation,
-                            'phonetic': '',
-                            'meanings': [],
-                            'isPhrase': True
-                        }
-
-                        logger.info(f"[單字API] 成功處理為片語: {clean_text}")
-                        return jsonify(result)
+        try:
+            result = get_word_info_cached(clean_text)
+        except WordInfoNotFound as e:
+            return jsonify({'error': str(e)}), 404
 
-                    except Exception as e:
-                        logger.warning(f"[單字API] 片語翻譯失敗: {e}")
-                        return jsonify({
-                            'error': '無法獲取此文字的資訊'
-                        }), 404
-                else:
-                    raise
+        logger.info(f"[單字API] 成功獲取單字資訊: {clean_text}")
+        return jsonify(result)
         
     except Exception as e:
         logger.error(f"[單字API] 獲取單字資訊時發生錯誤: {e}", exc_info=True)
@@ -1163,20 +3190,18 @@ def get_word_banks():
         if not nickname:
             return jsonify({'error': '缺少暱稱參數'}), 400
 
-        word_banks = load_word_banks()
         # 只返回當前用戶的單字庫（以暱稱為前綴）
         banks_list = []
         prefix = f"{nickname}_"
-        for bank_name, bank_data in word_banks.items():
-            if bank_name.startswith(prefix):
-                # 移除暱稱前綴顯示給用戶
-                display_name = bank_name[len(prefix):]
-                banks_list.append({
-                    'name': display_name,
-                    'word_count': len(bank_data.get('words', {})),
-                    'created_at': bank_data.get('created_at', ''),
-                    'updated_at': bank_data.get('updated_at', '')
-                })
+        for bank_name, bank_data, word_count in storage.list_word_banks(prefix):
+            # 移除暱稱前綴顯示給用戶
+            display_name = bank_name[len(prefix):]
+            banks_list.append({
+                'name': display_name,
+                'word_count': word_count,
+                'created_at': bank_data.get('created_at', ''),
+                'updated_at': bank_data.get('updated_at', '')
+            })
         return jsonify({'word_banks': banks_list})
     except Exception as e:
         logger.error(f"[單字庫API] 獲取單字庫列表失敗: {e}", exc_info=True)
@@ -1190,12 +3215,11 @@ def get_word_bank(bank_name):
         if not nickname:
             return jsonify({'error': '缺少暱稱參數'}), 400
 
-        word_banks = load_word_banks()
         full_bank_name = f"{nickname}_{bank_name}"
-        if full_bank_name not in word_banks:
+        bank_data = storage.get_word_bank(full_bank_name)
+        if bank_data is None:
             return jsonify({'error': '單字庫不存在'}), 404
 
-        bank_data = word_banks[full_bank_name]
         # 返回單字列表
         words_list = []
         for word, word_info in bank_data.get('words', {}).items():
@@ -1229,22 +3253,10 @@ def add_word_to_bank(bank_name):
         if not nickname:
             return jsonify({'error': '缺少暱稱參數'}), 400
 
-        word_banks = load_word_banks()
         full_bank_name = f"{nickname}_{bank_name}"
 
-        # 如果單字庫不存在，創建新的
-        if full_bank_name not in word_banks:
-            word_banks[full_bank_name] = {
-                'words': {},
-                'created_at': datetime.now().isoformat(),
-                'updated_at': datetime.now().isoformat()
-            }
-
-        # 添加單字（包含間隔重複學習的初始數據）
-        if 'words' not in word_banks[full_bank_name]:
-            word_banks[full_bank_name]['words'] = {}
-
-        word_banks[full_bank_name]['words'][word] = {
+        # 添加單字（包含間隔重複學習的初始數據；單字庫不存在時會自動創建）
+        word_data = {
             'added_at': datetime.now().isoformat(),
             'word_info': word_info,
             # 間隔重複學習數據
@@ -1257,9 +3269,8 @@ def add_word_to_bank(bank_name):
                 'review_interval': 1  # 複習間隔（天）
             }
         }
-        word_banks[full_bank_name]['updated_at'] = datetime.now().isoformat()
 
-        if save_word_banks(word_banks):
+        if storage.save_word(full_bank_name, word, word_data, datetime.now().isoformat()):
             logger.info(f"[單字庫API] 單字 '{word}' 已加入單字庫 '{full_bank_name}'")
             return jsonify({'success': True, 'message': f'單字已加入單字庫 "{bank_name}"'})
         else:
@@ -1282,17 +3293,13 @@ def remove_word_from_bank(bank_name):
         if not nickname:
             return jsonify({'error': '缺少暱稱參數'}), 400
 
-        word_banks = load_word_banks()
         full_bank_name = f"{nickname}_{bank_name}"
 
-        if full_bank_name not in word_banks:
+        if not storage.has_word_bank(full_bank_name):
             return jsonify({'error': '單字庫不存在'}), 404
 
-        if word in word_banks[full_bank_name].get('words', {}):
-            del word_banks[full_bank_name]['words'][word]
-            word_banks[full_bank_name]['updated_at'] = datetime.now().isoformat()
-
-            if save_word_banks(word_banks):
+        if storage.get_word(full_bank_name, word) is not None:
+            if storage.delete_word(full_bank_name, word, datetime.now().isoformat()):
                 logger.info(f"[單字庫API] 單字 '{word}' 已從單字庫 '{full_bank_name}' 移除")
                 return jsonify({'success': True, 'message': f'單字已從單字庫移除'})
             else:
@@ -1312,15 +3319,12 @@ def delete_word_bank(bank_name):
         if not nickname:
             return jsonify({'error': '缺少暱稱參數'}), 400
 
-        word_banks = load_word_banks()
         full_bank_name = f"{nickname}_{bank_name}"
 
-        if full_bank_name not in word_banks:
+        if not storage.has_word_bank(full_bank_name):
             return jsonify({'error': '單字庫不存在'}), 404
 
-        del word_banks[full_bank_name]
-
-        if save_word_banks(word_banks):
+        if storage.delete_word_bank(full_bank_name):
             logger.info(f"[單字庫API] 單字庫 '{full_bank_name}' 已刪除")
             return jsonify({'success': True, 'message': f'單字庫已刪除'})
         else:
@@ -1343,19 +3347,12 @@ def create_word_bank():
         if not nickname:
             return jsonify({'error': '缺少暱稱參數'}), 400
 
-        word_banks = load_word_banks()
         full_bank_name = f"{nickname}_{bank_name}"
 
-        if full_bank_name in word_banks:
+        if storage.has_word_bank(full_bank_name):
             return jsonify({'error': '單字庫已存在'}), 400
 
-        word_banks[full_bank_name] = {
-            'words': {},
-            'created_at': datetime.now().isoformat(),
-            'updated_at': datetime.now().isoformat()
-        }
-
-        if save_word_banks(word_banks):
+        if storage.save_word_bank(full_bank_name, _new_word_bank()):
             logger.info(f"[單字庫API] 單字庫 '{full_bank_name}' 已創建")
             return jsonify({'success': True, 'message': f'單字庫已創建'})
         else:
@@ -1404,19 +3401,18 @@ def import_word_banks():
         if not isinstance(imported_banks, dict):
             return jsonify({'error': '無效的 JSON 格式'}), 400
         
-        # 載入現有單字庫
-        existing_banks = load_word_banks()
-        
-        # 處理匯入
+        # 處理匯入（只讀寫匯入檔中出現的單字庫）
         imported_count = 0
         skipped_count = 0
         merged_count = 0
+        changed_banks = {}
         
         for bank_name, bank_data in imported_banks.items():
-            if bank_name in existing_banks:
+            existing_bank = storage.get_word_bank(bank_name)
+            if existing_bank is not None:
                 # 如果單字庫已存在，詢問是否合併
                 # 這裡我們選擇合併（將新單字加入現有單字庫）
-                existing_words = existing_banks[bank_name].get('words', {})
+                existing_words = existing_bank.get('words', {})
                 imported_words = bank_data.get('words', {})
                 
                 # 合併單字（新單字會覆蓋舊單字）
@@ -1425,16 +3421,17 @@ def import_word_banks():
                         existing_words[word] = word_data
                         merged_count += 1
                 
-                existing_banks[bank_name]['words'] = existing_words
-                existing_banks[bank_name]['updated_at'] = datetime.now().isoformat()
+                existing_bank['words'] = existing_words
+                existing_bank['updated_at'] = datetime.now().isoformat()
+                changed_banks[bank_name] = existing_bank
                 merged_count += len(imported_words) - merged_count
             else:
                 # 新單字庫，直接添加
-                existing_banks[bank_name] = bank_data
+                changed_banks[bank_name] = bank_data
                 imported_count += 1
         
         # 保存
-        if save_word_banks(existing_banks):
+        if all(storage.save_word_bank(name, bank) for name, bank in changed_banks.items()):
             logger.info(f"[單字庫API] 匯入完成: 新增 {imported_count} 個單字庫, 合併 {merged_count} 個單字")
             return jsonify({
                 'success': True,
@@ -1451,10 +3448,138 @@ def import_word_banks():
         logger.error(f"[單字庫API] 匯入失敗: {e}", exc_info=True)
         return jsonify({'error': f'匯入失敗：{str(e)}'}), 500
 
+class TtsCache:
+    """語音內容定址緩存：以「語言 + 正規化文字」的雜湊為文件名，總大小超過上限時淘汰最久未使用的文件
+
+    最近使用時間以文件的修改時間記錄（命中時更新），讓重啟後與其他 worker 也能沿用 LRU 順序。
+    各 worker 的索引只看得到自己的寫入，因此估計總量超過上限或距上次掃描超過
+    RESCAN_INTERVAL 秒時，才重新掃描磁碟取得實際總量再淘汰。
+    """
+
+    RESCAN_INTERVAL = 60
+
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = os.path.abspath(cache_dir)  # send_file 需要絕對路徑
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # 路徑 -> 文件大小，依最近使用排序
+        self._total = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._evict_lock = FileLock(os.path.join(self.cache_dir, '.evict.lock'))
+        self._scan()
+
+    def _scan(self):
+        """依修改時間從磁碟重建 LRU 索引（其他 worker 的寫入與淘汰也會反映在內）"""
+        self._entries = OrderedDict()
+        self._total = 0
+        self._scanned_at = time.time()
+        files = []
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                if not name.endswith('.mp3'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, path, stat.st_size))
+        for _, path, size in sorted(files):
+            self._entries[path] = size
+            self._total += size
+
+    @staticmethod
+    def key(text, lang):
+        """內容雜湊（同時作為 ETag）"""
+        normalized = ' '.join(text.split())
+        return hashlib.sha256(f'{lang}\n{normalized}'.encode('utf-8')).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f'{key}.mp3')
+
+    def get(self, key):
+        """返回已緩存音頻的路徑（未緩存時返回 None）"""
+        path = self.path(key)
+        try:
+            os.utime(path)  # 記錄最近使用時間
+            size = os.path.getsize(path)
+        except OSError:
+            with self._lock:
+                size = self._entries.pop(path, None)
+                if size is not None:
+                    self._total -= size
+            return None
+        with self._lock:
+            if path not in self._entries:
+                # 其他 worker 寫入的文件
+                self._entries[path] = size
+                self._total += size
+            self._entries.move_to_end(path)
+        return path
+
+    def put(self, key, data):
+        """寫入音頻並淘汰超出上限的舊文件，返回文件路徑"""
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        
+        with self._lock:
+            self._total -= self._entries.pop(path, 0)
+            self._entries[path] = len(data)
+            self._total += len(data)
+            if (self._total <= self.max_bytes
+                    and time.time() - self._scanned_at < self.RESCAN_INTERVAL):
+                return path
+        
+        # 淘汰前重新掃描磁碟，計入其他 worker 寫入的文件
+        evicted = []
+        with self._evict_lock, self._lock:
+            self._scan()
+            if path in self._entries:
+                self._entries.move_to_end(path)
+            while self._total > self.max_bytes and len(self._entries) > 1:
+                old_path, old_size = self._entries.popitem(last=False)
+                self._total -= old_size
+                evicted.append(old_path)
+            for old_path in evicted:
+                try:
+                    os.remove(old_path)
+                except OSError:
+                    pass
+        if evicted:
+            logger.info(f"[TTS 緩存] 淘汰 {len(evicted)} 個文件，目前 {self._total / 1024 / 1024:.1f} MB")
+        return path
+
+
+tts_cache = TtsCache(
+    TTS_CACHE_DIR,
+    max_bytes=float(os.environ.get('TTS_CACHE_MAX_MB', 200)) * 1024 * 1024
+)
+
+# 語音音頻在瀏覽器端的緩存時間（內容定址，不會改變）
+TTS_MAX_AGE = 7 * 24 * 3600
+
+
+def send_tts_file(path, key):
+    """返回緩存的音頻文件（conditional=True 處理 If-None-Match 與 Range）"""
+    return send_file(
+        path,
+        mimetype='audio/mpeg',
+        etag=key,
+        conditional=True,
+        max_age=TTS_MAX_AGE
+    )
+
+
 @app.route('/api/tts/<text>')
 def get_tts(text):
-    """API：獲取文字轉語音音頻（使用 Google TTS）"""
-    import urllib.request
+    """API：獲取文字轉語音音頻（使用 Google TTS，並緩存於磁碟）
+
+    以 send_file 直接回傳緩存文件，支援 ETag / If-None-Match 與 Range 請求。
+    """
     import urllib.parse
     
     try:
@@ -1470,25 +3595,33 @@ def get_tts(text):
         if len(clean_text) > 200:
             clean_text = clean_text[:200]
         
+        lang = 'en'
+        key = TtsCache.key(clean_text, lang)
+        path = tts_cache.get(key)
+        if path is not None:
+            try:
+                return send_tts_file(path, key)
+            except FileNotFoundError:
+                # 在打開前被其他 worker 淘汰，重新獲取
+                logger.info(f"[TTS 緩存] 文件已被淘汰，重新獲取: {key[:12]}")
+        
         # 使用 Google TTS API
-        tts_url = f'https://translate.google.com/translate_tts?ie=UTF-8&tl=en&client=tw-ob&q={urllib.parse.quote(clean_text)}'
+        tts_url = f'https://translate.google.com/translate_tts?ie=UTF-8&tl={lang}&client=tw-ob&q={urllib.parse.quote(clean_text)}'
         
         # 獲取音頻數據
-        req = urllib.request.Request(tts_url)
-        req.add_header('User-Agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
+        response = http_client.get(tts_url, timeout=10, headers={
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        })
+        response.raise_for_status()
         
-        with urllib.request.urlopen(req, timeout=10) as response:
-            audio_data = response.read()
+        # 被限流時 Google 可能以 200 返回 HTML 驗證頁，只緩存真正的音頻
+        content_type = response.headers.get('Content-Type', '')
+        if not content_type.startswith('audio/'):
+            logger.warning(f"[TTS API] 非音頻回應（{content_type or '未知類型'}），不寫入緩存")
+            return jsonify({'error': '語音服務返回了非音頻內容'}), 502
         
-        # 返回音頻數據
-        return Response(
-            audio_data,
-            mimetype='audio/mpeg',
-            headers={
-                'Content-Type': 'audio/mpeg',
-                'Cache-Control': 'public, max-age=3600'
-            }
-        )
+        path = tts_cache.put(key, response.content)
+        return send_tts_file(path, key)
         
     except Exception as e:
         logger.error(f"[TTS API] 獲取語音失敗: {e}", exc_info=True)
@@ -1634,13 +3767,12 @@ def get_spaced_repetition_words(bank_name):
         if not nickname:
             return jsonify({'error': '缺少暱稱參數'}), 400
 
-        word_banks = load_word_banks()
         full_bank_name = f"{nickname}_{bank_name}"
+        bank_data = storage.get_word_bank(full_bank_name)
 
-        if full_bank_name not in word_banks:
+        if bank_data is None:
             return jsonify({'error': '單字庫不存在'}), 404
 
-        bank_data = word_banks[full_bank_name]
         words = bank_data.get('words', {})
         now = datetime.now()
 
@@ -1707,16 +3839,15 @@ def update_word_learning(bank_name):
         if not nickname:
             return jsonify({'error': '缺少暱稱參數'}), 400
 
-        word_banks = load_word_banks()
         full_bank_name = f"{nickname}_{bank_name}"
 
-        if full_bank_name not in word_banks:
+        if not storage.has_word_bank(full_bank_name):
             return jsonify({'error': '單字庫不存在'}), 404
 
-        if word not in word_banks[full_bank_name].get('words', {}):
+        word_data = storage.get_word(full_bank_name, word)
+        if word_data is None:
             return jsonify({'error': '單字不存在'}), 404
 
-        word_data = word_banks[full_bank_name]['words'][word]
         learning_data = word_data.get('learning_data', {})
 
         # 更新學習數據
@@ -1747,9 +3878,8 @@ def update_word_learning(bank_name):
 
         # 保存更新
         word_data['learning_data'] = learning_data
-        word_banks[full_bank_name]['updated_at'] = now.isoformat()
 
-        if save_word_banks(word_banks):
+        if storage.save_word(full_bank_name, word, word_data, now.isoformat()):
             logger.info(f"[間隔重複API] 單字 '{word}' 學習記錄已更新，正確: {correct}")
             return jsonify({'success': True, 'learning_data': learning_data})
         else:
@@ -1770,16 +3900,11 @@ def get_learning_records():
         if not nickname:
             return jsonify({'error': '缺少暱稱參數'}), 400
 
-        user_data = load_user_data()
-        if nickname not in user_data:
+        user = storage.get_user(nickname)
+        if user is None:
             return jsonify({'records': []})
 
-        # 如果沒有學習記錄，初始化空列表
-        if 'learning_records' not in user_data[nickname]:
-            user_data[nickname]['learning_records'] = []
-            save_user_data(user_data)
-
-        records = user_data[nickname]['learning_records']
+        records = user.get('learning_records', [])
 
         # 按時間降序排序並限制數量
         records.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
@@ -1806,13 +3931,11 @@ def add_learning_record():
         if not record_type:
             return jsonify({'error': '缺少記錄類型'}), 400
 
-        user_data = load_user_data()
-        if nickname not in user_data:
-            user_data[nickname] = get_user_stats(nickname)
+        user = get_user_stats(nickname)
 
         # 初始化學習記錄列表
-        if 'learning_records' not in user_data[nickname]:
-            user_data[nickname]['learning_records'] = []
+        if 'learning_records' not in user:
+            user['learning_records'] = []
 
         # 創建新記錄
         record = {
@@ -1823,13 +3946,13 @@ def add_learning_record():
         }
 
         # 添加到記錄列表
-        user_data[nickname]['learning_records'].append(record)
+        user['learning_records'].append(record)
 
         # 限制記錄數量，保留最新的500條
-        if len(user_data[nickname]['learning_records']) > 500:
-            user_data[nickname]['learning_records'] = user_data[nickname]['learning_records'][-500:]
+        if len(user['learning_records']) > 500:
+            user['learning_records'] = user['learning_records'][-500:]
 
-        save_user_data(user_data)
+        storage.save_user(nickname, user)
 
         logger.info(f"[學習記錄API] 添加學習記錄: {nickname} - {record_type}")
         return jsonify({'success': True, 'record_id': record['id']})
@@ -1847,13 +3970,12 @@ def get_learning_progress(bank_name):
         if not nickname:
             return jsonify({'error': '缺少暱稱參數'}), 400
 
-        word_banks = load_word_banks()
         full_bank_name = f"{nickname}_{bank_name}"
+        bank_data = storage.get_word_bank(full_bank_name)
 
-        if full_bank_name not in word_banks:
+        if bank_data is None:
             return jsonify({'error': '單字庫不存在'}), 404
 
-        bank_data = word_banks[full_bank_name]
         words = bank_data.get('words', {})
 
         # 統計學習進度
@@ -1911,8 +4033,7 @@ def get_bookmarks():
         if not nickname:
             return jsonify({'error': '缺少暱稱參數'}), 400
 
-        bookmarks_data = load_bookmarks()
-        user_bookmarks = bookmarks_data.get(nickname, [])
+        user_bookmarks = storage.get_user_bookmarks(nickname) or []
         
         logger.info(f"[書籤API] 獲取書籤成功，用戶: {nickname}，數量: {len(user_bookmarks)}")
         return jsonify({'bookmarks': user_bookmarks})
@@ -1934,10 +4055,7 @@ def save_bookmarks_api():
         if not isinstance(bookmarks, list):
             return jsonify({'error': '書籤數據格式錯誤'}), 400
 
-        bookmarks_data = load_bookmarks()
-        bookmarks_data[nickname] = bookmarks
-
-        if save_bookmarks(bookmarks_data):
+        if storage.save_user_bookmarks(nickname, bookmarks):
             logger.info(f"[書籤API] 保存書籤成功，用戶: {nickname}，數量: {len(bookmarks)}")
             return jsonify({'success': True, 'message': '書籤已保存'})
         else:
@@ -1959,16 +4077,14 @@ def delete_bookmark():
         if not bookmark_url:
             return jsonify({'error': '缺少書籤 URL'}), 400
 
-        bookmarks_data = load_bookmarks()
-        if nickname not in bookmarks_data:
+        user_bookmarks = storage.get_user_bookmarks(nickname)
+        if user_bookmarks is None:
             return jsonify({'error': '用戶書籤不存在'}), 404
 
-        user_bookmarks = bookmarks_data[nickname]
-        original_count = len(user_bookmarks)
-        bookmarks_data[nickname] = [b for b in user_bookmarks if b.get('url') != bookmark_url]
+        remaining_bookmarks = [b for b in user_bookmarks if b.get('url') != bookmark_url]
         
-        if len(bookmarks_data[nickname]) < original_count:
-            if save_bookmarks(bookmarks_data):
+        if len(remaining_bookmarks) < len(user_bookmarks):
+            if storage.save_user_bookmarks(nickname, remaining_bookmarks):
                 logger.info(f"[書籤API] 刪除書籤成功，用戶: {nickname}")
                 return jsonify({'success': True, 'message': '書籤已刪除'})
             else:
@@ -1992,7 +4108,7 @@ def record_bookmark_view():
         bookmarks_data = load_bookmarks()
         
         # 在所有用戶的書籤中查找並更新觀看次數
-        found = False
+        found = None
         for nickname, user_bookmarks in bookmarks_data.items():
             for bookmark in user_bookmarks:
                 if bookmark.get('url') == bookmark_url:
@@ -2001,13 +4117,14 @@ def record_bookmark_view():
                         bookmark['view_count'] = 0
                     bookmark['view_count'] = bookmark.get('view_count', 0) + 1
                     bookmark['last_viewed'] = datetime.now().isoformat()
-                    found = True
+                    found = nickname
                     break
-            if found:
+            if found is not None:
                 break
         
-        if found:
-            if save_bookmarks(bookmarks_data):
+        if found is not None:
+            # 只寫回被更新的用戶書籤
+            if storage.save_user_bookmarks(found, bookmarks_data[found]):
                 logger.info(f"[書籤API] 記錄書籤觀看成功，URL: {bookmark_url}")
                 return jsonify({'success': True})
             else:
@@ -2060,6 +4177,14 @@ def get_bookmark_leaderboard():
 
 
 if __name__ == '__main__':
+    # python app.py migrate-storage：重新從 JSON 文件匯入 SQLite（覆蓋資料庫內容）
+    if len(sys.argv) > 1 and sys.argv[1] == 'migrate-storage':
+        if not isinstance(storage, SqliteStorage):
+            print("STORAGE_BACKEND 不是 sqlite，無需匯入")
+            sys.exit(1)
+        migrate_json_to_sqlite(storage, JsonStorage(WORD_BANK_FILE, USER_DATA_FILE, BOOKMARKS_FILE), force=True)
+        sys.exit(0)
+
     # 生產環境使用環境變數 PORT，開發環境預設 5000
     port = int(os.environ.get('PORT', 5000))
     debug = os.environ.get('FLASK_ENV') == 'development'
@@ -66,10 +66,8 @@ document.getElementById('loadVideo').addEventListener('click', async () => {
         }
         
         // 清除任何正在進行的翻譯進度監聽
-        if (window.translationProgressInterval) {
-            clearInterval(window.translationProgressInterval);
-            window.translationProgressInterval = null;
-        }
+        stopTranslationProgressStream();
+        stopPlayheadReporting();
         
         // 移除翻譯進度條（如果存在）
         const progressDiv = document.getElementById('translation-progress');
@@ -188,7 +186,8 @@ async function loadSubtitles(videoId) {
     ensureSubtitleLinesClass();
     
     try {
-        const apiUrl = `/api/subtitles/${videoId}`;
+        // 帶上目前播放位置，需要翻譯時後端會從這裡開始翻譯
+        const apiUrl = `/api/subtitles/${videoId}?t=${Math.floor(getPlayheadTime())}`;
         console.log('[DEBUG] 請求字幕 API:', apiUrl);
         console.log('[DEBUG] 開始時間:', new Date().toISOString());
         
@@ -300,106 +299,165 @@ function startTranslationProgress(progressKey, hasChinese, total) {
     subtitlesDiv.innerHTML = progressHtml + existingContent;
     
     // 清除之前的翻譯進度監聽（如果存在）
-    if (window.translationProgressInterval) {
-        clearInterval(window.translationProgressInterval);
-    }
+    stopTranslationProgressStream();
+    
+    // 回報播放位置，讓後端優先翻譯即將播放的字幕
+    startPlayheadReporting(progressKey);
     
-    // 開始輪詢進度
+    // 透過 Server-Sent Events 接收進度（斷線時瀏覽器會以 Last-Event-ID 自動續傳）
     let startTime = Date.now();
     let lastTranslated = 0;
-    let lastIndex = 0; // 追蹤已接收的字幕索引
     
-    window.translationProgressInterval = setInterval(async () => {
-        try {
-            const response = await fetch(`/api/translation-progress/${progressKey}?last_index=${lastIndex}`);
-            if (!response.ok) {
-                throw new Error('無法獲取翻譯進度');
-            }
-            
-            const progress = await response.json();
+    const source = new EventSource(`/api/translation-progress/${progressKey}/stream?last_index=0`);
+    window.translationProgressSource = source;
+    
+    source.addEventListener('progress', (event) => {
+        const progress = JSON.parse(event.data);
+        
+        // 實時更新新翻譯的字幕
+        if (progress.new_items && progress.new_items.length > 0) {
+            console.log(`[DEBUG] 收到 ${progress.new_items.length} 條新翻譯的字幕`);
             
-            // 實時更新新翻譯的字幕
-            if (progress.new_items && progress.new_items.length > 0) {
-                console.log(`[DEBUG] 收到 ${progress.new_items.length} 條新翻譯的字幕`);
+            // 更新字幕陣列
+            for (const newItem of progress.new_items) {
+                // 找到對應的字幕並更新
+                const index = subtitles.findIndex(sub => 
+                    Math.abs(sub.start - newItem.start) < 0.1 && 
+                    sub.english === newItem.english
+                );
                 
-                // 更新字幕陣列
-                for (const newItem of progress.new_items) {
-                    // 找到對應的字幕並更新
-                    const index = subtitles.findIndex(sub => 
-                        Math.abs(sub.start - newItem.start) < 0.1 && 
-                        sub.english === newItem.english
-                    );
-                    
-                    if (index !== -1) {
-                        subtitles[index].chinese = newItem.chinese;
-                        console.log(`[DEBUG] 更新第 ${index} 條字幕的中文翻譯`);
-                    }
+                if (index !== -1) {
+                    subtitles[index].chinese = newItem.chinese;
+                    console.log(`[DEBUG] 更新第 ${index} 條字幕的中文翻譯`);
                 }
-                
-                // 立即重新渲染字幕（實時顯示）
-                renderSubtitles();
-                lastIndex = progress.last_index;
             }
             
-            if (progress.completed) {
-                clearInterval(window.translationProgressInterval);
-                window.translationProgressInterval = null;
-                
-                // 確保所有字幕都已更新
-                console.log('[DEBUG] 翻譯完成，最終更新字幕...');
-                renderSubtitles();
-                
-                // 移除進度條
-                setTimeout(() => {
-                    const progressDiv = document.getElementById('translation-progress');
-                    if (progressDiv) {
-                        progressDiv.remove();
-                        renderSubtitles(); // 重新渲染，移除進度條
-                    }
-                }, 1000); // 1秒後移除進度條
-                
-                console.log('[DEBUG] 字幕更新完成');
-                return;
-            }
-            
-            // 更新進度條
-            const percent = Math.round((progress.current / progress.total) * 100);
-            const progressBar = document.getElementById('translation-progress-bar');
-            const percentDiv = document.getElementById('translation-percent');
-            const currentDiv = document.getElementById('translation-current');
-            const totalDiv = document.getElementById('translation-total');
-            const timeDiv = document.getElementById('translation-time');
-            
-            if (progressBar) progressBar.style.width = percent + '%';
-            if (percentDiv) percentDiv.textContent = percent + '%';
-            if (currentDiv) currentDiv.textContent = progress.current;
-            if (totalDiv) totalDiv.textContent = progress.total;
+            // 立即重新渲染字幕（實時顯示）
+            renderSubtitles();
+        }
+        
+        // 更新進度條
+        const percent = Math.round((progress.current / progress.total) * 100);
+        const progressBar = document.getElementById('translation-progress-bar');
+        const percentDiv = document.getElementById('translation-percent');
+        const currentDiv = document.getElementById('translation-current');
+        const totalDiv = document.getElementById('translation-total');
+        const timeDiv = document.getElementById('translation-time');
+        
+        if (progressBar) progressBar.style.width = percent + '%';
+        if (percentDiv) percentDiv.textContent = percent + '%';
+        if (currentDiv) currentDiv.textContent = progress.current;
+        if (totalDiv) totalDiv.textContent = progress.total;
+        
+        // 計算預計剩餘時間
+        if (progress.translated > 0 && progress.translated !== lastTranslated) {
+            const elapsed = (Date.now() - startTime) / 1000;
+            const avgTimePerItem = elapsed / progress.translated;
+            const remaining = Math.ceil((progress.total - progress.current) * avgTimePerItem);
             
-            // 計算預計剩餘時間
-            if (progress.translated > 0 && progress.translated !== lastTranslated) {
-                const elapsed = (Date.now() - startTime) / 1000;
-                const avgTimePerItem = elapsed / progress.translated;
-                const remaining = Math.ceil((progress.total - progress.current) * avgTimePerItem);
-                
-                if (timeDiv) {
-                    if (remaining < 60) {
-                        timeDiv.textContent = `預計剩餘時間: ${remaining} 秒`;
-                    } else {
-                        const minutes = Math.floor(remaining / 60);
-                        const seconds = remaining % 60;
-                        timeDiv.textContent = `預計剩餘時間: ${minutes} 分 ${seconds} 秒`;
-                    }
+            if (timeDiv) {
+                if (remaining < 60) {
+                    timeDiv.textContent = `預計剩餘時間: ${remaining} 秒`;
+                } else {
+                    const minutes = Math.floor(remaining / 60);
+                    const seconds = remaining % 60;
+                    timeDiv.textContent = `預計剩餘時間: ${minutes} 分 ${seconds} 秒`;
                 }
-                
-                lastTranslated = progress.translated;
             }
             
-        } catch (error) {
-            console.error('[DEBUG] 獲取翻譯進度失敗:', error);
-            clearInterval(window.translationProgressInterval);
-            window.translationProgressInterval = null;
+            lastTranslated = progress.translated;
         }
-    }, 300); // 每 0.3 秒更新一次，更快響應
+    });
+    
+    source.addEventListener('complete', () => {
+        stopTranslationProgressStream();
+        stopPlayheadReporting();
+        
+        // 確保所有字幕都已更新
+        console.log('[DEBUG] 翻譯完成，最終更新字幕...');
+        renderSubtitles();
+        
+        // 移除進度條
+        setTimeout(() => {
+            const progressDiv = document.getElementById('translation-progress');
+            if (progressDiv) {
+                progressDiv.remove();
+                renderSubtitles(); // 重新渲染，移除進度條
+            }
+        }, 1000); // 1秒後移除進度條
+        
+        console.log('[DEBUG] 字幕更新完成');
+    });
+    
+    source.addEventListener('not_found', () => {
+        console.error('[DEBUG] 獲取翻譯進度失敗: 找不到進度資訊');
+        stopTranslationProgressStream();
+        stopPlayheadReporting();
+    });
+    
+    source.onerror = () => {
+        // 連線中斷時 EventSource 會自動重連；只有連線被關閉（例如 404）才停止
+        if (source.readyState === EventSource.CLOSED) {
+            console.error('[DEBUG] 翻譯進度連線已關閉');
+            stopTranslationProgressStream();
+            stopPlayheadReporting();
+        }
+    };
+}
+
+// 停止接收翻譯進度
+function stopTranslationProgressStream() {
+    if (window.translationProgressSource) {
+        window.translationProgressSource.close();
+        window.translationProgressSource = null;
+    }
+}
+
+// 取得目前播放位置（播放器尚未就緒時返回 0）
+function getPlayheadTime() {
+    if (player && typeof player.getCurrentTime === 'function') {
+        return (player.getCurrentTime() || 0) + timeOffset;
+    }
+    return 0;
+}
+
+// 翻譯進行中定期檢查播放位置，跳轉時回報給後端重新排序翻譯順序
+function startPlayheadReporting(progressKey) {
+    stopPlayheadReporting();
+    
+    let lastReportedTime = null;
+    let lastReportedAt = 0;
+    
+    const report = () => {
+        const currentTime = getPlayheadTime();
+        const now = Date.now();
+        
+        // 依正常播放推算的位置；與實際位置相差超過 5 秒視為跳轉
+        const expectedTime = lastReportedTime === null
+            ? null
+            : lastReportedTime + ((now - lastReportedAt) / 1000) * playbackSpeed;
+        if (expectedTime !== null && Math.abs(currentTime - expectedTime) < 5) {
+            return;
+        }
+        
+        lastReportedTime = currentTime;
+        lastReportedAt = now;
+        fetch(`/api/translation-progress/${progressKey}/seek`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ time: currentTime })
+        }).catch(error => console.warn('[DEBUG] 回報播放位置失敗:', error));
+    };
+    
+    report();
+    window.translationPlayheadInterval = setInterval(report, 1000);
+}
+
+function stopPlayheadReporting() {
+    if (window.translationPlayheadInterval) {
+        clearInterval(window.translationPlayheadInterval);
+        window.translationPlayheadInterval = null;
+    }
 }
 
 // 更新翻譯後的字幕